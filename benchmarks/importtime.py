@@ -0,0 +1,69 @@
+"""
+Check the import cost of `bingto.app` with `python -X importtime`.
+
+Exits with a non-zero status if a heavy dependency gets imported at module
+level again, or if the cumulative import time exceeds the budget.
+
+Usage: python benchmarks/importtime.py [--module bingto.app] [--budget-ms 150]
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Top-level packages that must only be imported by the code path using them.
+HEAVY_MODULES = ("playwright", "playwright_stealth", "requests", "english_words")
+
+
+def parse_importtime(output: str) -> dict[str, tuple[int, int]]:
+    """
+    Parse `-X importtime` output into {module: (self_us, cumulative_us)}.
+    """
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="bingto.app")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=150,
+        help="Maximum cumulative import time of the module.",
+    )
+    args = parser.parse_args()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {args.module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = parse_importtime(result.stderr)
+    failed = False
+    heavy = sorted(
+        name for name in modules if name.split(".")[0] in HEAVY_MODULES
+    )
+    if heavy:
+        print(f"Heavy modules imported by {args.module}: {', '.join(heavy)}")
+        failed = True
+    cumulative_ms = modules[args.module][1] / 1000
+    print(f"{args.module}: {cumulative_ms:.1f} ms cumulative import time")
+    slowest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)
+    for name, (self_us, _) in slowest[:10]:
+        print(f"  {self_us / 1000:8.2f} ms  {name}")
+    if cumulative_ms > args.budget_ms:
+        print(f"Import time is over the {args.budget_ms:.0f} ms budget.")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+Run launch_pc() and start_mobile() against the local Bing stand-in.
+
+Needs no network access, only the Playwright browsers (`bingto --install`).
+Exits with a non-zero status if a scenario doesn't end the way it should.
+
+Usage: python benchmarks/replay.py [-n RUNS] [--mobile-browser webkit] [--lite]
+
+With --lite, every scenario also runs with resource blocking and the loaded
+bytes of both modes are compared.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bingto import aio, app  # noqa: E402
+from bingto.blocker import (  # noqa: E402
+    AsyncResourceBlocker,
+    ResourceBlocker,
+    format_bytes,
+)
+from bingto.replay import ReplayServer, ReplayState  # noqa: E402
+from bingto.memory import (  # noqa: E402
+    log_browser_memory,
+    low_memory_context_options,
+)
+from bingto.report import Report  # noqa: E402
+from bingto.storage import CookieStore  # noqa: E402
+
+EMPTY_STORAGE_STATE = {"cookies": [], "origins": []}
+
+
+def run_pc(pool: app.BrowserPool, server: ReplayServer, blocker: ResourceBlocker):
+    with tempfile.TemporaryDirectory() as tmp:
+        app.launch_pc(
+            pool,
+            silent=True,
+            force_chromium=True,
+            store=CookieStore(Path(tmp, "cookies.json"), EMPTY_STORAGE_STATE),
+            blocker=blocker,
+            base_url=server.url,
+            login_url=server.login_url,
+            low_memory=pool.low_memory,
+        )
+
+
+def mobile_device(pool) -> dict:
+    device = pool.p.devices["iPhone 13 Pro Max"]
+    if pool.low_memory:
+        device = low_memory_context_options(device, mobile=True)
+    return device
+
+
+def run_mobile(
+    pool: app.BrowserPool,
+    server: ReplayServer,
+    blocker: ResourceBlocker,
+    browser_name: str,
+):
+    browser = pool.get(browser_name)
+    context = browser.new_context(
+        **mobile_device(pool), storage_state=EMPTY_STORAGE_STATE
+    )
+    blocker.attach(context)
+    try:
+        app.start_mobile(
+            context.new_page(), base_url=server.url, login_url=server.login_url
+        )
+        blocker.log_stats("Mobile", app.report)
+        log_browser_memory("Mobile", app.report)
+    finally:
+        context.close()
+
+
+def check_expired(
+    pool: app.BrowserPool, server: ReplayServer, blocker: ResourceBlocker
+):
+    try:
+        run_pc(pool, server, blocker)
+    except SystemExit:
+        return
+    raise AssertionError("Expired session was not detected.")
+
+
+async def run_pc_async(
+    pool: aio.BrowserPool, server: ReplayServer, blocker: AsyncResourceBlocker
+):
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            await aio.launch_pc(
+                pool,
+                silent=True,
+                force_chromium=True,
+                store=CookieStore(Path(tmp, "cookies.json"), EMPTY_STORAGE_STATE),
+                blocker=blocker,
+                base_url=server.url,
+                login_url=server.login_url,
+                low_memory=pool.low_memory,
+            )
+        finally:
+            await aio.flush_cookies()
+
+
+async def run_mobile_async(
+    pool: aio.BrowserPool,
+    server: ReplayServer,
+    blocker: AsyncResourceBlocker,
+    browser_name: str,
+):
+    browser = await pool.get(browser_name)
+    context = await browser.new_context(
+        **mobile_device(pool), storage_state=EMPTY_STORAGE_STATE
+    )
+    await blocker.attach(context)
+    try:
+        await aio.start_mobile(
+            await context.new_page(), base_url=server.url, login_url=server.login_url
+        )
+        blocker.log_stats("Mobile", app.report)
+        log_browser_memory("Mobile", app.report)
+    finally:
+        await context.close()
+
+
+async def check_expired_async(
+    pool: aio.BrowserPool, server: ReplayServer, blocker: AsyncResourceBlocker
+):
+    try:
+        await run_pc_async(pool, server, blocker)
+    except SystemExit:
+        return
+    raise AssertionError("Expired session was not detected.")
+
+
+def run_scenario(name: str, pool, args, lite: bool, loop=None) -> dict:
+    state = ReplayState(max_points=args.max_points, session_expired=name == "expired")
+    # Each scenario gets a fresh report so its spans can be compared.
+    app.report = Report()
+    # Without blocking, the loaded bytes are still counted as a baseline.
+    blocker = (ResourceBlocker if loop is None else AsyncResourceBlocker)(block=lite)
+    with ReplayServer(state=state, score_delay=args.score_delay) as server:
+        start = time.perf_counter()
+        match (name, loop is None):
+            case ("pc", True):
+                run_pc(pool, server, blocker)
+            case ("mobile", True):
+                run_mobile(pool, server, blocker, args.mobile_browser)
+            case ("expired", True):
+                check_expired(pool, server, blocker)
+            case ("pc", False):
+                loop.run_until_complete(run_pc_async(pool, server, blocker))
+            case ("mobile", False):
+                loop.run_until_complete(
+                    run_mobile_async(pool, server, blocker, args.mobile_browser)
+                )
+            case ("expired", False):
+                loop.run_until_complete(check_expired_async(pool, server, blocker))
+        elapsed = time.perf_counter() - start
+    if name != "expired" and state.score - state.start_score != args.max_points:
+        raise AssertionError(
+            f"{name}: earned {state.score - state.start_score} points"
+            f" out of {args.max_points}."
+        )
+    return {"elapsed": elapsed, "searches": state.searches, "report": app.report}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--runs", type=int, default=3)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=["pc", "mobile", "expired"],
+        help="Scenario to run, can be repeated (default: all).",
+    )
+    parser.add_argument(
+        "--mobile-browser", choices=["chromium", "webkit"], default="webkit"
+    )
+    parser.add_argument("--max-points", type=int, default=15)
+    parser.add_argument("--score-delay", type=int, default=300)
+    parser.add_argument(
+        "--wait-scale",
+        type=float,
+        default=0.1,
+        help="Multiplier for the random human-like waits.",
+    )
+    parser.add_argument(
+        "--score-timeout", type=float, default=1, help="get_score() deadline."
+    )
+    parser.add_argument(
+        "--score-settle",
+        type=float,
+        default=0.25,
+        help="How long after a search get_score() waits for an unchanged score"
+        " to change.",
+    )
+    parser.add_argument("--engine", choices=["sync", "async"], default="sync")
+    parser.add_argument(
+        "--low-memory", action="store_true", help="Use the low memory profile."
+    )
+    parser.add_argument(
+        "--lite",
+        action="store_true",
+        help="Also run every scenario with resource blocking and compare.",
+    )
+    parser.add_argument("--json", help="Also write the results to this file.")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    app.WAIT_SCALE = args.wait_scale
+    app.SCORE_TIMEOUT = args.score_timeout
+    app.SCORE_SETTLE = args.score_settle
+    if args.engine == "async":
+        results = run_async(args)
+    else:
+        results = run_sync(args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+def summarize(name: str, runs: list[dict], args) -> dict:
+    samples = [run["elapsed"] for run in runs]
+    gauges = runs[-1]["report"].to_dict()["gauges"]
+    loaded = sum(v for k, v in gauges.items() if k.endswith(".loaded_bytes"))
+    print(
+        f"{name} ({args.engine}): median {statistics.median(samples):.2f} s,"
+        f" min {min(samples):.2f} s, max {max(samples):.2f} s,"
+        f" loaded {format_bytes(loaded)}"
+        f" ({runs[-1]['searches']} searches, {args.runs} runs)"
+    )
+    return {
+        "samples": samples,
+        "median": statistics.median(samples),
+        "searches": runs[-1]["searches"],
+        "phases": runs[-1]["report"].to_dict()["phases"],
+        "gauges": gauges,
+        "loaded_bytes": loaded,
+    }
+
+
+def compare_lite(name: str, results: dict):
+    plain = results[name]["loaded_bytes"]
+    lite = results[f"{name}-lite"]["loaded_bytes"]
+    print(
+        f"{name}: --lite saved {format_bytes(plain - lite)}"
+        f" ({(plain - lite) / plain:.0%} of {format_bytes(plain)})"
+        if plain
+        else f"{name}: nothing loaded"
+    )
+
+
+def scenarios(args) -> list[tuple[str, bool]]:
+    names = args.scenario or ["pc", "mobile", "expired"]
+    modes = [False, True] if args.lite else [False]
+    return [(name, lite) for name in names for lite in modes]
+
+
+def run_sync(args) -> dict:
+    from playwright.sync_api import sync_playwright
+
+    results = {}
+    with sync_playwright() as p:
+        pool = app.BrowserPool(p, headless=True, low_memory=args.low_memory)
+        try:
+            for name, lite in scenarios(args):
+                if name == "mobile" and args.mobile_browser != "chromium":
+                    pool.release("chromium")
+                runs = [run_scenario(name, pool, args, lite) for _ in range(args.runs)]
+                key = f"{name}-lite" if lite else name
+                results[key] = summarize(key, runs, args)
+                if lite:
+                    compare_lite(name, results)
+        finally:
+            pool.close()
+    return results
+
+
+def run_async(args) -> dict:
+    from playwright.async_api import async_playwright
+
+    results = {}
+    loop = asyncio.new_event_loop()
+    manager = async_playwright()
+    p = loop.run_until_complete(manager.__aenter__())
+    pool = aio.BrowserPool(p, headless=True, low_memory=args.low_memory)
+    try:
+        for name, lite in scenarios(args):
+            if name == "mobile" and args.mobile_browser != "chromium":
+                loop.run_until_complete(pool.release("chromium"))
+            runs = [
+                run_scenario(name, pool, args, lite, loop) for _ in range(args.runs)
+            ]
+            key = f"{name}-lite" if lite else name
+            results[key] = summarize(key, runs, args)
+            if lite:
+                compare_lite(name, results)
+    finally:
+        loop.run_until_complete(pool.close())
+        loop.run_until_complete(manager.__aexit__(None, None, None))
+        loop.close()
+    return results
+
+
+if __name__ == "__main__":
+    main()
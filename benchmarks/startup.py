@@ -0,0 +1,43 @@
+"""
+Measure the cold-start time of `python -m bingto --help`.
+
+Usage: python benchmarks/startup.py [-n RUNS] [-- extra bingto args]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run_once(args: list[str]) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "bingto", *args],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=True,
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--runs", type=int, default=10)
+    parser.add_argument("args", nargs="*", default=["--help"])
+    args = parser.parse_args()
+    # Warm up the OS file cache so the first sample isn't an outlier.
+    run_once(args.args)
+    samples = [run_once(args.args) for _ in range(args.runs)]
+    print(f"python -m bingto {' '.join(args.args)} ({args.runs} runs)")
+    print(f"  min:    {min(samples) * 1000:.1f} ms")
+    print(f"  median: {statistics.median(samples) * 1000:.1f} ms")
+    print(f"  max:    {max(samples) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,654 @@
+"""
+async_playwright implementation of the PC & mobile phases (`bingto --async`).
+
+Mirrors the sync functions in bingto.app, but waits with asyncio.sleep so
+the Edge version lookup and cookie persistence can run while the browser
+is starting.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from bingto import app
+from bingto.app import READ_SCORE_JS
+from bingto.blocker import AsyncResourceBlocker
+from bingto.capture import SCREENSHOT_TIMEOUT, capture
+from bingto.constant import (
+    EDGE_VERSION_TTL,
+    EDGE_PRODUCTS_URL,
+    BING_URL,
+    LOGIN_URL,
+)
+from bingto.memory import low_memory_launch_options
+from bingto.storage import CookieStore
+from contextlib import asynccontextmanager
+from random import uniform
+from time import monotonic
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from playwright.async_api import (
+        Page,
+        Browser,
+        BrowserContext,
+        BrowserType,
+        Playwright,
+    )
+
+
+stealth_async = None
+
+
+async def stealth(page: Page):
+    """
+    Apply playwright_stealth to the page, importing it on first use.
+    """
+    global stealth_async
+    if stealth_async is None:
+        if app.fake_playwright_stealth_init:
+            stealth_async = dummy_stealth_async
+        else:
+            try:
+                from playwright_stealth import stealth_async
+            except ImportError:
+                logging.warning("playwright_stealth failed to import.")
+                app.init_fake_playwright_stealth()
+                stealth_async = dummy_stealth_async
+    await stealth_async(page)
+
+
+async def dummy_stealth_async(page: Page):
+    logging.warning("Dummy function called.")
+
+
+async def wait(a: float, b: float):
+    """
+    Wait for a random amount of time between a and b seconds.
+    """
+    await asyncio.sleep(uniform(a, b) * app.WAIT_SCALE)
+
+
+async def debug_pause():
+    """
+    Pause the program if DEBUG is True, without blocking the event loop.
+    """
+    if app.DEBUG and app.DEBUG_PAUSE:
+        await asyncio.to_thread(app.Debug.pause)
+
+
+async def debug_screenshot(page: Page, name: str):
+    """
+    Capture a screenshot and the DOM of the page if DEBUG is True, see
+    bingto.app.Debug.screenshot.
+    """
+    if not app.DEBUG:
+        return
+    from playwright.async_api import Error
+
+    try:
+        screenshot = await page.screenshot(timeout=SCREENSHOT_TIMEOUT)
+    except Error as e:
+        app.Debug.print(f"Failed to take screenshot: {e}")
+        screenshot = None
+    try:
+        html = await page.content()
+    except Error as e:
+        app.Debug.print(f"Failed to get page content: {e}")
+        html = None
+    capture.add(name, page.url, screenshot, html)
+
+
+async def debug_failure(page: Page, reason: str):
+    """
+    Save the last captures and the current page if DEBUG is True.
+    """
+    if app.DEBUG:
+        await debug_screenshot(page, "failure")
+        capture.dump(reason)
+
+
+@asynccontextmanager
+async def debug_on_failure(page: Page, step: str):
+    """
+    Call debug_failure if a Playwright error escapes the enclosed block.
+    """
+    from playwright.async_api import Error
+
+    try:
+        yield
+    except Error as e:
+        await debug_failure(page, f"{step} failed ({type(e).__name__})")
+        raise
+
+
+async def create_browser(
+    p: Playwright, headless: bool, browser_type: BrowserType = None, **kwargs
+) -> Browser:
+    from playwright.async_api import Error
+
+    browser_type = browser_type or p.chromium
+    try:
+        return await browser_type.launch(headless=headless, channel="msedge", **kwargs)
+    except Error as e:
+        logging.info(f"Error occurred while launching Edge: {e}")
+        logging.info("Trying to launch Chromium...")
+        return await browser_type.launch(headless=headless, **kwargs)
+
+
+class BrowserPool:
+    """
+    Async counterpart of bingto.app.BrowserPool.
+
+    Concurrent get() calls for the same browser share a single launch.
+    """
+
+    def __init__(self, p: Playwright, headless: bool = False, low_memory: bool = False):
+        self.p = p
+        self.headless = headless
+        self.low_memory = low_memory
+        self._browsers: dict[tuple[str, bool], asyncio.Task] = {}
+
+    async def _launch(self, name: str, try_edge: bool) -> Browser:
+        browser_type = getattr(self.p, name)
+        options = low_memory_launch_options(name) if self.low_memory else {}
+        with app.report.span(f"browser.launch.{name}"):
+            if try_edge:
+                return await create_browser(
+                    self.p, self.headless, browser_type, **options
+                )
+            return await browser_type.launch(headless=self.headless, **options)
+
+    async def get(self, name: str = "chromium", try_edge: bool = False) -> Browser:
+        """
+        Get a browser of the given type, launching it if necessary.
+        """
+        key = (name, try_edge)
+        task = self._browsers.get(key)
+        if task is not None and not (
+            task.done() and (task.cancelled() or task.exception())
+        ):
+            browser = await task
+            if browser.is_connected():
+                return browser
+        task = asyncio.create_task(self._launch(name, try_edge))
+        self._browsers[key] = task
+        return await task
+
+    @staticmethod
+    async def _close(task: asyncio.Task):
+        if not task.done():
+            task.cancel()
+            return
+        if task.cancelled() or task.exception():
+            return
+        browser = task.result()
+        if browser.is_connected():
+            await browser.close()
+
+    async def release(self, name: str):
+        """
+        Close the browsers of the given type, once no phase needs them anymore.
+        """
+        for key in [key for key in self._browsers if key[0] == name]:
+            logging.info(f"Closing browser ({name})...")
+            await self._close(self._browsers.pop(key))
+
+    async def close(self):
+        """
+        Close all launched browsers.
+        """
+        for task in self._browsers.values():
+            await self._close(task)
+        self._browsers.clear()
+
+
+# Keeps a reference to the writes still in progress, see flush_cookies().
+_pending_writes: set[asyncio.Task] = set()
+
+
+async def write_cookies(store: CookieStore, phase: str):
+    try:
+        with app.report.span(f"{phase}.storage_state.write"):
+            written = await asyncio.to_thread(store.flush)
+        if written:
+            logging.info("Browser cookies saved.")
+    except OSError:
+        logging.exception("Error occurred while saving new cookies")
+        logging.warning("This may cause issues in the future.")
+
+
+async def save_cookies(context: BrowserContext, store: CookieStore, phase: str):
+    """
+    Read the context's cookies into the store and write them in the
+    background.
+
+    The store has the new cookies as soon as this returns, only the file
+    is written later (see flush_cookies()).
+    """
+    from playwright.async_api import Error
+
+    try:
+        with app.report.span(f"{phase}.storage_state"):
+            state = await context.storage_state()
+    except Error:
+        logging.exception("Error occurred while reading new cookies")
+        logging.warning("This may cause issues in the future.")
+        return
+    if not store.replace(state):
+        app.Debug.print("Browser cookies unchanged, not saving.")
+        return
+    task = asyncio.create_task(write_cookies(store, phase))
+    _pending_writes.add(task)
+    task.add_done_callback(_pending_writes.discard)
+
+
+async def flush_cookies():
+    """
+    Wait for the cookie writes started by save_cookies() to finish.
+    """
+    await asyncio.gather(*_pending_writes)
+
+
+async def check_session(page: Page, login_url: str = LOGIN_URL):
+    """
+    Check if the session has expired.
+
+    This is meant to be called after logging in.
+    """
+    await page.wait_for_load_state()
+    app.exit_if_session_expired(await page.evaluate("location.href"), login_url)
+
+
+async def wait_for_score(page: Page, selector: str, previous: int, timeout: float):
+    """
+    Wait up to timeout seconds for the element to hold a number other than
+    previous, and return it (or None).
+    """
+    from playwright.async_api import Error, TimeoutError
+
+    deadline = monotonic() + timeout
+    while (remaining := deadline - monotonic()) > 0:
+        try:
+            score = await page.wait_for_function(
+                READ_SCORE_JS, arg=[selector, previous], timeout=remaining * 1000
+            )
+            return int(await score.json_value())
+        except TimeoutError:
+            return None
+        except Error as e:
+            if app.NAVIGATION_ERROR not in str(e):
+                raise
+            # The page navigated while waiting, try again on the new one.
+            app.report.count("get_score.retries")
+            app.Debug.print(f"Error occurred while waiting for score: {e}")
+    return None
+
+
+async def get_score(
+    page: Page,
+    mobile: bool = False,
+    previous: int = -1,
+    timeout: float = None,
+    since: float = None,
+) -> int:
+    """
+    Get the current score, see bingto.app.get_score.
+
+    Returns -1 if an error occurred.
+    """
+    from playwright.async_api import TimeoutError
+
+    if timeout is None:
+        timeout = app.SCORE_TIMEOUT
+    selector = "#fly_id_rc" if mobile else "#id_rc"
+    deadline = monotonic() + timeout
+    settled = (since or monotonic()) + app.SCORE_SETTLE
+    if mobile and not await page.locator(selector).is_visible():
+        logging.info("Mobile mode, opening drawer...")
+        try:
+            await page.locator("#mHamburger").click(timeout=timeout * 1000)
+        except TimeoutError:
+            logging.info("Timeout occurred while opening drawer.")
+            return -1
+    logging.info("Getting score...")
+    score = await wait_for_score(page, selector, -1, deadline - monotonic())
+    if score is None:
+        logging.info("Timeout occurred while getting score.")
+        app.report.count("get_score.failures")
+        return -1
+    if score == previous:
+        changed = await wait_for_score(
+            page, selector, previous, settled - monotonic()
+        )
+        if changed is None:
+            logging.info("Score did not change.")
+            return score
+        return changed
+    return score
+
+
+async def type_query(page: Page, query: str):
+    """
+    Simulate typing on Bing.
+    """
+    search_box = page.locator("#sb_form_q")
+    await search_box.click()
+    await wait(1, 2)
+    await search_box.clear()
+    await wait(1, 2)
+    await page.keyboard.type(query, delay=50)
+    await wait(1, 2)
+    await page.locator(".sa_sg").first.wait_for()
+    await app.choose_suggestion(await page.locator(".sa_sg").all()).click()
+
+
+async def search(page: Page, mobile: bool = False):
+    from playwright.async_api import TimeoutError
+
+    phase = "mobile" if mobile else "pc"
+    progress = app.SearchProgress(phase)
+    m_no_click_result = False
+    for i in range(app.SEARCH_ATTEMPTS):
+        async with debug_on_failure(page, f"{phase} search {i + 1}"):
+            with app.report.span(f"{phase}.search"):
+                logging.info(f"Search attempt {i + 1}/{app.SEARCH_ATTEMPTS}")
+                query = app.random_query()
+                if mobile:
+                    if i == 0:
+                        logging.debug(
+                            "Simulating typing (first search) on mobile..."
+                        )
+                        await page.locator("#HBleft").click()
+                        await wait(1, 2)
+                        await page.locator("#sb_form_c").click()
+                        await wait(2, 3)
+                        await page.keyboard.type(query, delay=50)
+                        await wait(1, 2)
+                        await page.keyboard.press("Enter")
+                    else:
+                        logging.debug("Simulating typing on mobile...")
+                        try:
+                            await page.locator("#HBleft").click(timeout=1000)
+                        except TimeoutError:
+                            logging.info("Drawer already closed.")
+                        await type_query(page, query)
+                    await wait(2, 3)
+                    logging.debug("Locating the first search result...")
+                    click_attempt = 0
+                    while click_attempt < 5 and not m_no_click_result:
+                        try:
+                            await page.locator(".tilk").first.click(timeout=1000)
+                            await wait(2, 3)
+                            await page.go_back()
+                            break
+                        except TimeoutError:
+                            logging.info(
+                                "Timeout occurred while locating first search"
+                                " result."
+                            )
+                            logging.info("Trying again...")
+                            app.report.count("mobile.result_click.retries")
+                            click_attempt += 1
+                            await wait(1, 2)
+                        if click_attempt == 5:
+                            logging.warning(
+                                "Failed to locate first search result, skipping from later on."  # noqa: E501
+                            )
+                            await debug_failure(
+                                page, f"mobile search {i + 1}: no result"
+                            )
+                            m_no_click_result = True
+                            break
+                    await wait(2, 3)
+                else:
+                    if i == 0:
+                        await page.locator("#sb_form_q").click()
+                        await wait(2, 3)
+                        await page.keyboard.type(query, delay=50)
+                        await wait(1, 2)
+                        await page.keyboard.press("Enter")
+                    else:
+                        logging.debug("Simulating typing on PC...")
+                        await type_query(page, query)
+                searched_at = monotonic()
+                await wait(1, 2)
+                with app.report.span(f"{phase}.get_score"):
+                    score = await get_score(
+                        page, mobile, progress.previous, since=searched_at
+                    )
+                if not progress.record(score):
+                    break
+                if score == -1:
+                    await debug_failure(page, f"{phase} search {i + 1}: no score")
+                    continue
+                await debug_pause()
+    logging.info("Search complete.")
+
+
+async def launch_pc(
+    pool: BrowserPool,
+    silent: bool = False,
+    force_chromium: bool = False,
+    store: CookieStore | None = None,
+    blocker: AsyncResourceBlocker | None = None,
+    base_url: str = BING_URL,
+    login_url: str = LOGIN_URL,
+    low_memory: bool = False,
+):
+    """
+    Run the PC searches.
+
+    Cookies are saved to store (cookies.json by default) in the background,
+    use flush_cookies() to wait for them to be written.
+    """
+    store = store or CookieStore()
+    logging.info("Launching browser (PC version)...")
+    browser = await pool.get(
+        "chromium", try_edge=app.use_edge(silent, force_chromium)
+    )
+    logging.info("Loading config & cookies...")
+    context = await browser.new_context(
+        **app.pc_context_options(pool.p, low_memory),
+        storage_state=await asyncio.to_thread(store.load),
+    )
+    if blocker:
+        await blocker.attach(context)
+    page = await context.new_page()
+    await stealth(page)
+    logging.info("Visiting Bing...")
+    with app.report.span("pc.goto"):
+        await page.goto(base_url)
+    await debug_screenshot(page, "bing-chromium-1")
+    await debug_pause()
+    await wait(2, 3)
+    logging.info("Clicking the 'Login' button...")
+    await debug_screenshot(page, "bing-chromium-2")
+    await page.locator("#id_l").click()
+    await debug_pause()
+    await wait(1, 2)
+    with app.report.span("pc.check_session"):
+        await check_session(page, login_url)
+    # Keep the refreshed session even if something fails later on.
+    await save_cookies(context, store, "pc")
+    logging.info("Executing search function...")
+    await search(page)
+    await debug_pause()
+    app.log_phase_stats("PC", blocker)
+    logging.info("Saving browser cookies...")
+    await save_cookies(context, store, "pc")
+    logging.info("Closing browser context...")
+    await context.close()
+
+
+async def start_mobile(
+    page: Page,
+    base_url: str = BING_URL,
+    login_url: str = LOGIN_URL,
+    store: CookieStore | None = None,
+):
+    from playwright.async_api import TimeoutError
+
+    await stealth(page)
+    logging.info("Visiting Bing...")
+    with app.report.span("mobile.goto"):
+        await page.goto(base_url)
+    await debug_screenshot(page, "bing-webkit-1")
+    await debug_pause()
+    await wait(1, 2)
+    if await get_score(page, mobile=True) == -1:
+        logging.info("Clicking the 'Login' button...")
+        try:
+            await page.locator("#hb_s").click(timeout=1000)
+        except TimeoutError:
+            logging.exception(
+                "Failed to click the 'Login' button, assuming we're logged in."
+            )
+    await wait(3, 5)
+    with app.report.span("mobile.check_session"):
+        await check_session(page, login_url)
+    if store:
+        # Keep the refreshed session even if something fails later on.
+        await save_cookies(page.context, store, "mobile")
+    logging.info("Executing search function...")
+    await search(page, True)
+    await debug_pause()
+
+
+async def get_mobile_edge_version(
+    url: str = EDGE_PRODUCTS_URL, ttl: float = EDGE_VERSION_TTL
+) -> str:
+    """
+    Look up the Edge for iOS version in a worker thread.
+    """
+    from bingto.edge import get_mobile_edge_version
+
+    with app.report.span("mobile.edge_version"):
+        return await asyncio.to_thread(get_mobile_edge_version, url, ttl=ttl)
+
+
+async def launch_mobile(
+    pool: BrowserPool,
+    silent: bool = False,
+    no_webkit: bool = False,
+    force_chromium: bool = False,
+    real_viewport: bool = False,
+    use_pc_profile: bool = False,
+    edge_version: asyncio.Future | str | None = None,
+    store: CookieStore | None = None,
+    blocker: AsyncResourceBlocker | None = None,
+    base_url: str = BING_URL,
+    login_url: str = LOGIN_URL,
+    products_url: str = EDGE_PRODUCTS_URL,
+    low_memory: bool = False,
+    edge_version_ttl: float = EDGE_VERSION_TTL,
+):
+    """
+    Run the mobile searches.
+
+    edge_version may be a future started earlier so the lookup overlaps with
+    other work; if None, it is looked up (honouring edge_version_ttl) while
+    the browser launches.
+
+    Cookies are saved to store in the background, like in launch_pc().
+    """
+    store = store or CookieStore()
+    p = pool.p
+    logging.info("Launching browser (1) (Mobile version)...")
+    if edge_version is None:
+        edge_version = asyncio.ensure_future(
+            get_mobile_edge_version(products_url, edge_version_ttl)
+        )
+    launch = pool.get(*app.mobile_browser(no_webkit, silent, force_chromium))
+    if isinstance(edge_version, str):
+        browser = await launch
+    else:
+        browser, edge_version = await asyncio.gather(launch, edge_version)
+    options = app.mobile_context_options(p, edge_version, use_pc_profile, low_memory)
+    logging.info("Loading config & cookies...")
+    context = await browser.new_context(
+        **options, storage_state=await asyncio.to_thread(store.load)
+    )
+    if blocker:
+        await blocker.attach(context)
+    page = await context.new_page()
+    if real_viewport and (size := app.real_viewport_size(p, low_memory)):
+        await page.set_viewport_size(size)
+    await start_mobile(page, base_url, login_url, store)
+    app.log_phase_stats("Mobile", blocker)
+    logging.info("Saving browser cookies...")
+    await save_cookies(context, store, "mobile")
+    logging.info("Closing browser context...")
+    await context.close()
+
+
+async def run(args: argparse.Namespace):
+    """
+    Run the PC and mobile phases as configured by args.
+    """
+    from playwright.async_api import async_playwright
+
+    if args.use_search_v2:
+        logging.warning("--use-search-v2 is not supported with --async, ignoring.")
+
+    def make_blocker() -> AsyncResourceBlocker | None:
+        if args.lite:
+            return AsyncResourceBlocker(args.block_resource_types, args.block_domains)
+        if args.report:
+            # Count the loaded bytes so the report can be compared with --lite.
+            return AsyncResourceBlocker(block=False)
+        return None
+
+    # Start the slow, browser-independent work right away.
+    store = CookieStore()
+    load_task = asyncio.create_task(asyncio.to_thread(store.load))
+    edge_version = None
+    if not args.skip_mobile:
+        edge_version = asyncio.create_task(
+            get_mobile_edge_version(
+                args.edge_products_url, args.m_edge_version_ttl * 3600
+            )
+        )
+    async with async_playwright() as p:
+        pool = BrowserPool(p, args.silent, args.low_memory)
+        try:
+            await load_task
+            # PC
+            if not args.skip_pc:
+                # The cookies are written while the mobile browser is starting.
+                await launch_pc(
+                    pool,
+                    args.silent,
+                    args.force_chromium,
+                    store,
+                    make_blocker(),
+                    args.bing_url,
+                    args.login_url,
+                    args.low_memory,
+                )
+            if args.skip_mobile or not args.no_webkit:
+                # Don't keep Chromium running next to WebKit.
+                await pool.release("chromium")
+            # Mobile
+            if not args.skip_mobile:
+                await launch_mobile(
+                    pool,
+                    args.silent,
+                    args.no_webkit,
+                    args.force_chromium,
+                    args.m_real_viewport,
+                    args.m_use_pc_profile,
+                    edge_version,
+                    store,
+                    make_blocker(),
+                    args.bing_url,
+                    args.login_url,
+                    args.edge_products_url,
+                    args.low_memory,
+                    args.m_edge_version_ttl * 3600,
+                )
+        finally:
+            logging.info("Closing browser...")
+            await asyncio.gather(pool.close(), flush_cookies())
+            if edge_version and not edge_version.done():
+                edge_version.cancel()
@@ -1,32 +1,59 @@
+from __future__ import annotations
+
 import argparse
 import json
 import logging
-import requests
 import string
 import sys
 from bingto import __version__
-from bingto.constant import VALID_IOS_VERSIONS, EDGE_IOS_UA, WORD_LIST
-from playwright.sync_api import (
-    sync_playwright,
-    Error,
-    Page,
-    Browser,
-    BrowserType,
-    TimeoutError,
-    Playwright,
+from bingto.blocker import (
+    DEFAULT_BLOCKED_DOMAINS,
+    DEFAULT_BLOCKED_RESOURCE_TYPES,
+    ResourceBlocker,
+)
+from bingto.constant import (
+    VALID_IOS_VERSIONS,
+    EDGE_IOS_UA,
+    EDGE_VERSION_TTL,
+    EDGE_PRODUCTS_URL,
+    BING_URL,
+    LOGIN_URL,
+)
+from bingto.capture import (
+    DEFAULT_CAPTURE_DIR,
+    DEFAULT_CAPTURE_SIZE,
+    SCREENSHOT_TIMEOUT,
+    capture,
+)
+from bingto.memory import (
+    log_browser_memory,
+    low_memory_context_options,
+    low_memory_launch_options,
 )
+from bingto.report import report
+from bingto.storage import CookieStore
+from contextlib import contextmanager
 from pathlib import Path
-from time import sleep
+from time import monotonic, sleep
 from random import choice, randint, uniform
 from runpy import run_module
+from typing import TYPE_CHECKING
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s %(name)s (%(funcName)s) (%(filename)s:%(lineno)d) [%(levelname)s]: %(message)s",
-)  # noqa: E501
+# Playwright, requests and playwright_stealth are slow to import, so they are
+# imported by the code paths that need them instead of at module level.
+if TYPE_CHECKING:
+    import cProfile
+    from playwright.sync_api import (
+        Page,
+        Browser,
+        BrowserContext,
+        BrowserType,
+        Playwright,
+    )
 
 
 fake_playwright_stealth_init = False
+stealth_sync = None
 
 
 def init_fake_playwright_stealth():
@@ -43,15 +70,24 @@ def init_fake_playwright_stealth():
         pass
 
 
-try:
-    from playwright_stealth import stealth_sync
-except ImportError:
-    logging.warning("playwright_stealth failed to import.")
-    init_fake_playwright_stealth()
+def stealth(page: Page):
+    """
+    Apply playwright_stealth to the page, importing it on first use.
+    """
+    global stealth_sync
+    if stealth_sync is None:
+        try:
+            from playwright_stealth import stealth_sync
+        except ImportError:
+            logging.warning("playwright_stealth failed to import.")
+            init_fake_playwright_stealth()
+    stealth_sync(page=page)
 
 
 DEBUG = False
 DEBUG_PAUSE = False
+# Multiplier for every wait(), only meant to be changed by benchmarks.
+WAIT_SCALE = 1.0
 
 
 class Debug:
@@ -67,10 +103,49 @@ class Debug:
     @staticmethod
     def screenshot(page: Page, name: str):
         """
-        Take a screenshot if DEBUG is True.
+        Capture a screenshot and the DOM of the page if DEBUG is True.
+
+        They are kept in memory and only saved if a step fails, see
+        Debug.failure.
+        """
+        if not DEBUG:
+            return
+        from playwright.sync_api import Error
+
+        try:
+            screenshot = page.screenshot(timeout=SCREENSHOT_TIMEOUT)
+        except Error as e:
+            Debug.print(f"Failed to take screenshot: {e}")
+            screenshot = None
+        try:
+            html = page.content()
+        except Error as e:
+            Debug.print(f"Failed to get page content: {e}")
+            html = None
+        capture.add(name, page.url, screenshot, html)
+
+    @staticmethod
+    def failure(page: Page, reason: str):
+        """
+        Save the last captures and the current page if DEBUG is True.
         """
         if DEBUG:
-            page.screenshot(path=f"{name}.png")
+            Debug.screenshot(page, "failure")
+            capture.dump(reason)
+
+    @staticmethod
+    @contextmanager
+    def on_failure(page: Page, step: str):
+        """
+        Call Debug.failure if a Playwright error escapes the enclosed block.
+        """
+        from playwright.sync_api import Error
+
+        try:
+            yield
+        except Error as e:
+            Debug.failure(page, f"{step} failed ({type(e).__name__})")
+            raise
 
     @staticmethod
     def print(*args, **kwargs):
@@ -85,44 +160,131 @@ def wait(a: float, b: float):
     """
     Wait for a random amount of time between a and b seconds.
     """
-    sleep(uniform(a, b))
+    sleep(uniform(a, b) * WAIT_SCALE)
 
 
 def create_browser(
-    p: Playwright, headless: bool, browser_type: BrowserType = None
+    p: Playwright, headless: bool, browser_type: BrowserType = None, **kwargs
 ) -> Browser:
+    from playwright.sync_api import Error
+
     try:
         if browser_type:
-            browser = browser_type.launch(headless=headless, channel="msedge")
+            browser = browser_type.launch(headless=headless, channel="msedge", **kwargs)
         else:
-            browser = p.chromium.launch(headless=headless, channel="msedge")
+            browser = p.chromium.launch(headless=headless, channel="msedge", **kwargs)
     except Error as e:
         logging.info(f"Error occurred while launching Edge: {e}")
         logging.info("Trying to launch Chromium...")
         if browser_type:
-            browser = browser_type.launch(headless=headless)
+            browser = browser_type.launch(headless=headless, **kwargs)
         else:
-            browser = p.chromium.launch(headless=headless)
+            browser = p.chromium.launch(headless=headless, **kwargs)
     return browser
 
 
-def login():
+def use_edge(silent: bool, force_chromium: bool) -> bool:
+    """
+    Whether Chromium-based phases should try Edge first.
+
+    Both phases must agree on it to share the browser (see BrowserPool).
+    """
+    return not (silent or force_chromium)
+
+
+class BrowserPool:
+    """
+    Launch each browser at most once and share it between the phases.
+
+    Every phase gets its own context, so only the browser process is shared.
+    Browsers the next phase won't use should be closed with release().
+    """
+
+    def __init__(self, p: Playwright, headless: bool = False, low_memory: bool = False):
+        self.p = p
+        self.headless = headless
+        self.low_memory = low_memory
+        self._browsers: dict[tuple[str, bool], Browser] = {}
+
+    def get(self, name: str = "chromium", try_edge: bool = False) -> Browser:
+        """
+        Get a browser of the given type, launching it if necessary.
+
+        If try_edge is True, Edge is tried first (see create_browser).
+        """
+        key = (name, try_edge)
+        browser = self._browsers.get(key)
+        if browser is not None and browser.is_connected():
+            logging.info(f"Reusing already launched browser ({name}).")
+            return browser
+        browser_type = getattr(self.p, name)
+        options = low_memory_launch_options(name) if self.low_memory else {}
+        with report.span(f"browser.launch.{name}"):
+            if try_edge:
+                browser = create_browser(
+                    self.p, self.headless, browser_type, **options
+                )
+            else:
+                browser = browser_type.launch(headless=self.headless, **options)
+        self._browsers[key] = browser
+        return browser
+
+    def release(self, name: str):
+        """
+        Close the browsers of the given type, once no phase needs them anymore.
+        """
+        for key in [key for key in self._browsers if key[0] == name]:
+            browser = self._browsers.pop(key)
+            if browser.is_connected():
+                logging.info(f"Closing browser ({name})...")
+                browser.close()
+
+    def close(self):
+        """
+        Close all launched browsers.
+        """
+        for browser in self._browsers.values():
+            if browser.is_connected():
+                browser.close()
+        self._browsers.clear()
+
+
+def save_cookies(context: BrowserContext, store: CookieStore, phase: str):
+    """
+    Save the context's cookies to the store if they changed.
+    """
+    from playwright.sync_api import Error
+
+    try:
+        with report.span(f"{phase}.storage_state"):
+            if store.update(context.storage_state()):
+                logging.info("Browser cookies saved.")
+            else:
+                Debug.print("Browser cookies unchanged, not saving.")
+    except (Error, OSError):
+        logging.exception("Error occurred while saving new cookies")
+        logging.warning("This may cause issues in the future.")
+
+
+def login(login_url: str = LOGIN_URL):
     """
     Initiate the login process for Bing.
     """
+    from playwright.sync_api import sync_playwright, Error
+
     logging.info("This will initiate the login process for Bing.")
     logging.info("After logging in, press [ENTER] to continue.")
     with sync_playwright() as p:
         browser = create_browser(p, False)
         context = browser.new_context()
         page = context.new_page()
-        stealth_sync(page=page)
-        page.goto("https://login.live.com/login.srf")
+        stealth(page)
+        page.goto(login_url)
         input()
         logging.info("Saving browser cookies...")
         try:
-            context.storage_state(path="cookies.json")
-        except Error as e:
+            CookieStore().update(context.storage_state())
+        except (Error, OSError) as e:
             logging.info(f"Error occurred while saving cookies: {e}")
             exit(1)
         logging.info("Cookies saved to cookies.json")
@@ -143,7 +305,7 @@ def get_url(page: Page) -> str:
     return page.evaluate("location.href")
 
 
-def check_session(page: Page):
+def check_session(page: Page, login_url: str = LOGIN_URL):
     """
     Check if the session has expired.
 
@@ -151,48 +313,108 @@ def check_session(page: Page):
     """
     # https://www.bing.com/secure/Passport.aspx
     # If we got this then we need to re-authenticate again.
-    url: str = get_url(page)
+    page.wait_for_load_state()
+    exit_if_session_expired(get_url(page), login_url)
+
+
+def exit_if_session_expired(url: str, login_url: str):
+    """
+    Exit if url is the login page Bing redirects to when the session expired.
+    """
     Debug.print(url)
     if "https%3a%2f%2fwww.bing.com%2fsecure%2fPassport.aspx" in url and url.startswith(
-        "https://login.live.com/login.srf"
+        login_url
     ):
         logging.error("Session expired, please delete cookies.json and try again.")
         # Exit because we can't do anything else.
         exit(1)
 
 
-def get_score(page: Page, mobile: bool = False) -> int:
+# Resolves to the score once the element holds a number other than previous.
+READ_SCORE_JS = """([selector, previous]) => {
+    const element = document.querySelector(selector);
+    const text = element ? element.textContent.replace(/[\\s,.]/g, "") : "";
+    return /^\\d+$/.test(text) && Number(text) !== previous ? text : null;
+}"""
+SCORE_TIMEOUT = 5
+# Bing first shows the old score and updates it later. A score equal to the
+# previous one can change until this many seconds after the search, as long
+# as the fixed wait(3, 4) before reading it used to give.
+SCORE_SETTLE = 4
+# wait_for_function() fails with this when the page navigates.
+NAVIGATION_ERROR = "Execution context was destroyed"
+
+
+def wait_for_score(page: Page, selector: str, previous: int, timeout: float):
+    """
+    Wait up to timeout seconds for the element to hold a number other than
+    previous, and return it (or None).
+    """
+    from playwright.sync_api import Error, TimeoutError
+
+    deadline = monotonic() + timeout
+    while (remaining := deadline - monotonic()) > 0:
+        try:
+            score = page.wait_for_function(
+                READ_SCORE_JS, arg=[selector, previous], timeout=remaining * 1000
+            )
+            return int(score.json_value())
+        except TimeoutError:
+            return None
+        except Error as e:
+            # Only a navigation is worth waiting through, a closed page isn't.
+            if NAVIGATION_ERROR not in str(e):
+                raise
+            # Try again on the new page.
+            report.count("get_score.retries")
+            Debug.print(f"Error occurred while waiting for score: {e}")
+    return None
+
+
+def get_score(
+    page: Page,
+    mobile: bool = False,
+    previous: int = -1,
+    timeout: float = None,
+    since: float = None,
+) -> int:
     """
     Get the current score.
 
+    Waits up to timeout (SCORE_TIMEOUT by default) seconds for the score
+    element to hold a number. If it equals previous, it's returned once it
+    changes, or as-is SCORE_SETTLE seconds after since (the monotonic() time
+    of the search, now by default).
+
     Returns -1 if an error occurred.
     """
-    if mobile:
+    from playwright.sync_api import TimeoutError
+
+    if timeout is None:
+        timeout = SCORE_TIMEOUT
+    selector = "#fly_id_rc" if mobile else "#id_rc"
+    deadline = monotonic() + timeout
+    settled = (since or monotonic()) + SCORE_SETTLE
+    if mobile and not page.locator(selector).is_visible():
         logging.info("Mobile mode, opening drawer...")
-        page.locator("#mHamburger").click()
-        wait(0.5, 1.5)
-        for _ in range(3):
-            logging.info("Getting score...")
-            try:
-                return int(page.locator("#fly_id_rc").inner_text(timeout=1000))
-            except ValueError:
-                logging.info("Error occurred while parsing score, waiting...")
-                wait(0.5, 1.5)
-            except TimeoutError:
-                logging.info("Timeout occurred while parsing score, opening drawer...")
-                page.locator("#mHamburger").click()
-                wait(0.5, 1.5)
-        return -1
-    else:
-        logging.info("PC mode.")
-        for _ in range(3):
-            logging.info("Getting score...")
-            try:
-                return int(page.locator("#id_rc").inner_text(timeout=1000))
-            except ValueError:
-                logging.info("Error occurred while parsing score, waiting...")
-                wait(0.5, 1.5)
+        try:
+            page.locator("#mHamburger").click(timeout=timeout * 1000)
+        except TimeoutError:
+            logging.info("Timeout occurred while opening drawer.")
+            return -1
+    logging.info("Getting score...")
+    score = wait_for_score(page, selector, -1, deadline - monotonic())
+    if score is None:
+        logging.info("Timeout occurred while getting score.")
+        report.count("get_score.failures")
         return -1
+    if score == previous:
+        changed = wait_for_score(page, selector, previous, settled - monotonic())
+        if changed is None:
+            logging.info("Score did not change.")
+            return score
+        return changed
+    return score
 
 
 def type_query(page: Page, query: str):
@@ -209,172 +431,287 @@ def type_query(page: Page, query: str):
     page.keyboard.type(query, delay=50)
     # search_box.fill(query)
     wait(1, 2)
-    suggestions = page.locator(".sa_sg").all()
-    # Exclude the last 2 suggestions because they are not.
-    suggestion = suggestions[randint(0, len(suggestions) - 3)]
-    suggestion.click()
+    page.locator(".sa_sg").first.wait_for()
+    choose_suggestion(page.locator(".sa_sg").all()).click()
     # page.keyboard.press("Enter")
 
 
-def search_v2(page: Page, mobile: bool = False):
-    prev_score = -1
-    same_score_count = 0
-    logging.info("Using new search method...")
-    for i in range(50):
-        logging.info(f"Search attempt {i + 1}/50")
-        if mobile:
-            raise NotImplementedError("Mobile search is not supported yet.")
-            if i == 0:
-                pass
-            else:
-                pass
-        else:
-            if i != 0:
-                page.go_back()
-                wait(2, 3)
-            form_q = page.locator("#sb_form_q")
-            form_q.click()
-            wait(2, 3)
-            suggestions = page.locator(".sa_sg").all()
-            # Exclude the last 2 suggestions because they are not.
-            suggestion = suggestions[
-                randint(len(suggestions) - 5, len(suggestions) - 3)
-            ]
-            suggestion.click()
-            wait(2, 3)
-        wait(3, 4)
-        curr_score = get_score(page, mobile)
-        logging.info(f"Score (current / previous): {curr_score} / {prev_score}")
-        if curr_score == -1:
+def choose_suggestion(suggestions: list):
+    # Exclude the last 2 suggestions because they are not.
+    return suggestions[randint(0, len(suggestions) - 3)]
+
+
+def random_query() -> str:
+    word_len = randint(2, 3)
+    # word_list = get_word_list()  # from bingto.wordlist
+    # words = [choice(word_list) for _ in range(word_len)]
+    words = [choice(string.ascii_lowercase) for _ in range(word_len)]
+    logging.info(f"Words: {words} ({word_len})")
+    return "".join(words)
+
+
+SEARCH_ATTEMPTS = 50
+
+
+class SearchProgress:
+    """
+    Keep track of the scores read by a search loop (in either engine) and
+    decide when to stop.
+    """
+
+    def __init__(self, phase: str):
+        self.phase = phase
+        self.previous = -1
+        self.same_score_count = 0
+
+    def record(self, score: int) -> bool:
+        """
+        Record the score read after a search.
+
+        Returns False once searching more won't earn points.
+        """
+        report.score(self.phase, score)
+        logging.info(f"Score (current / previous): {score} / {self.previous}")
+        if score == -1:
             logging.info("Error occurred while parsing score, skipping...")
-            continue
-        if curr_score == prev_score:
-            logging.info(f"Same score count: {same_score_count}")
-            if same_score_count == 3:
+            return True
+        if score == self.previous:
+            logging.info(f"Same score count: {self.same_score_count}")
+            if self.same_score_count == 3:
                 logging.info(
                     "Score did not change 3 times, probably we searched enough."
                 )
                 logging.info(
                     "If the score isn't full, please report this issue on GitHub."
                 )
-                break
-            same_score_count += 1
+                return False
+            self.same_score_count += 1
         else:
-            same_score_count = 0
-        prev_score = curr_score
-        Debug.pause()
+            self.same_score_count = 0
+        self.previous = score
+        return True
+
+
+def search_v2(page: Page, mobile: bool = False):
+    phase = "mobile" if mobile else "pc"
+    progress = SearchProgress(phase)
+    logging.info("Using new search method...")
+    for i in range(SEARCH_ATTEMPTS):
+        with Debug.on_failure(page, f"{phase} search {i + 1}"), report.span(
+            f"{phase}.search"
+        ):
+            logging.info(f"Search attempt {i + 1}/{SEARCH_ATTEMPTS}")
+            if mobile:
+                raise NotImplementedError("Mobile search is not supported yet.")
+                if i == 0:
+                    pass
+                else:
+                    pass
+            else:
+                if i != 0:
+                    page.go_back()
+                    wait(2, 3)
+                form_q = page.locator("#sb_form_q")
+                form_q.click()
+                wait(2, 3)
+                suggestions = page.locator(".sa_sg").all()
+                # Exclude the last 2 suggestions because they are not.
+                suggestion = suggestions[
+                    randint(len(suggestions) - 5, len(suggestions) - 3)
+                ]
+                suggestion.click()
+                wait(2, 3)
+            searched_at = monotonic()
+            wait(1, 2)
+            with report.span(f"{phase}.get_score"):
+                score = get_score(page, mobile, progress.previous, since=searched_at)
+            if not progress.record(score):
+                break
+            if score == -1:
+                Debug.failure(page, f"{phase} search {i + 1}: no score")
+                continue
+            Debug.pause()
     logging.info("Search complete.")
 
 
 def search(page: Page, mobile: bool = False):
-    prev_score = -1
-    same_score_count = 0
+    from playwright.sync_api import TimeoutError
+
+    phase = "mobile" if mobile else "pc"
+    progress = SearchProgress(phase)
     m_no_click_result = False
-    for i in range(50):
-        logging.info(f"Search attempt {i + 1}/50")
-        word_len = randint(2, 3)
-        # words = []
-        # for _ in range(word_len):
-        # words.append(choice(list(WORD_LIST)))
-        words = [choice(string.ascii_lowercase) for _ in range(word_len)]
-        logging.info(f"Words: {words} ({word_len})")
-        if mobile:
-            if i == 0:
-                logging.debug("Simulating typing (first search) on mobile...")
-                page.locator("#HBleft").click()
-                wait(1, 2)
-                form_q = page.locator("#sb_form_c")
-                form_q.click()
-                wait(2, 3)
-                page.keyboard.type("".join(words), delay=50)
-                wait(1, 2)
-                page.keyboard.press("Enter")
-            else:
-                logging.debug("Simulating typing on mobile...")
-                try:
-                    page.locator("#HBleft").click(timeout=1000)
-                except TimeoutError:
-                    logging.info("Drawer already closed.")
-                type_query(page, "".join(words))
-            wait(2, 3)
-            logging.debug("Locating the first search result...")
-            click_attempt = 0
-            while click_attempt < 5 and not m_no_click_result:
-                try:
-                    page.locator(".tilk").first.click(timeout=1000)
+    for i in range(SEARCH_ATTEMPTS):
+        with Debug.on_failure(page, f"{phase} search {i + 1}"), report.span(
+            f"{phase}.search"
+        ):
+            logging.info(f"Search attempt {i + 1}/{SEARCH_ATTEMPTS}")
+            query = random_query()
+            if mobile:
+                if i == 0:
+                    logging.debug("Simulating typing (first search) on mobile...")
+                    page.locator("#HBleft").click()
+                    wait(1, 2)
+                    form_q = page.locator("#sb_form_c")
+                    form_q.click()
                     wait(2, 3)
-                    page.go_back()
-                    break
-                except TimeoutError:
-                    logging.info("Timeout occurred while locating first search result.")
-                    logging.info("Trying again...")
-                    click_attempt += 1
+                    page.keyboard.type(query, delay=50)
                     wait(1, 2)
-                if click_attempt == 5:
-                    logging.warning("Failed to locate first search result, skipping from later on.")
-                    m_no_click_result = True
-                    break
-            wait(2, 3)
-        else:
-            if i == 0:
-                form_q = page.locator("#sb_form_q")
-                form_q.click()
+                    page.keyboard.press("Enter")
+                else:
+                    logging.debug("Simulating typing on mobile...")
+                    try:
+                        page.locator("#HBleft").click(timeout=1000)
+                    except TimeoutError:
+                        logging.info("Drawer already closed.")
+                    type_query(page, query)
+                wait(2, 3)
+                logging.debug("Locating the first search result...")
+                click_attempt = 0
+                while click_attempt < 5 and not m_no_click_result:
+                    try:
+                        page.locator(".tilk").first.click(timeout=1000)
+                        wait(2, 3)
+                        page.go_back()
+                        break
+                    except TimeoutError:
+                        logging.info("Timeout occurred while locating first search result.")
+                        logging.info("Trying again...")
+                        report.count("mobile.result_click.retries")
+                        click_attempt += 1
+                        wait(1, 2)
+                    if click_attempt == 5:
+                        logging.warning("Failed to locate first search result, skipping from later on.")
+                        Debug.failure(page, f"mobile search {i + 1}: no result")
+                        m_no_click_result = True
+                        break
                 wait(2, 3)
-                page.keyboard.type("".join(words), delay=50)
-                wait(1, 2)
-                # page.keyboard.press("Tab")
-                # wait(1, 2)
-                page.keyboard.press("Enter")
             else:
-                logging.debug("Simulating typing on PC...")
-                type_query(page, "".join(words))
-        wait(3, 4)
-        curr_score = get_score(page, mobile)
-        logging.info(f"Score (current / previous): {curr_score} / {prev_score}")
-        if curr_score == -1:
-            logging.info("Error occurred while parsing score, skipping...")
-            continue
-        if curr_score == prev_score:
-            logging.info(f"Same score count: {same_score_count}")
-            if same_score_count == 3:
-                logging.info(
-                    "Score did not change 3 times, probably we searched enough."
-                )
-                logging.info(
-                    "If the score isn't full, please report this issue on GitHub."
-                )
+                if i == 0:
+                    form_q = page.locator("#sb_form_q")
+                    form_q.click()
+                    wait(2, 3)
+                    page.keyboard.type(query, delay=50)
+                    wait(1, 2)
+                    # page.keyboard.press("Tab")
+                    # wait(1, 2)
+                    page.keyboard.press("Enter")
+                else:
+                    logging.debug("Simulating typing on PC...")
+                    type_query(page, query)
+            searched_at = monotonic()
+            wait(1, 2)
+            with report.span(f"{phase}.get_score"):
+                score = get_score(page, mobile, progress.previous, since=searched_at)
+            if not progress.record(score):
                 break
-            same_score_count += 1
-        else:
-            same_score_count = 0
-        prev_score = curr_score
-        Debug.pause()
+            if score == -1:
+                Debug.failure(page, f"{phase} search {i + 1}: no score")
+                continue
+            Debug.pause()
     logging.info("Search complete.")
 
 
-def launch_pc(
+CONTEXT_OPTIONS = {"locale": "vi-VN", "timezone_id": "Asia/Ho_Chi_Minh"}
+
+
+def pc_context_options(p: Playwright, low_memory: bool = False) -> dict:
+    """
+    Get the browser context options of the PC phase, without the cookies.
+    """
+    edge = p.devices["Desktop Edge"]
+    if low_memory:
+        edge = low_memory_context_options(edge, mobile=False)
+    return {**edge, **CONTEXT_OPTIONS}
+
+
+def mobile_context_options(
     p: Playwright,
+    edge_version: str,
+    use_pc_profile: bool = False,
+    low_memory: bool = False,
+) -> dict:
+    """
+    Get the browser context options of the mobile phase, without the cookies.
+    """
+    if use_pc_profile:
+        device = p.devices["Desktop Edge"]
+    else:
+        device = p.devices["iPhone 13 Pro Max"]
+    logging.info("Edge version: " + edge_version)
+    user_agent = EDGE_IOS_UA.format(
+        IOS_VERSION=choice(VALID_IOS_VERSIONS).replace(".", "_"),
+        EDGE_VERSION=edge_version,
+    )
+    logging.info(f"Crafted UA: {user_agent}")
+    # p.devices is shared, don't modify it.
+    device = {**device, "user_agent": user_agent}
+    if low_memory:
+        device = low_memory_context_options(device, mobile=not use_pc_profile)
+    return {**device, **CONTEXT_OPTIONS}
+
+
+def mobile_browser(
+    no_webkit: bool, silent: bool, force_chromium: bool
+) -> tuple[str, bool]:
+    """
+    Get the BrowserPool.get() arguments of the mobile phase.
+    """
+    if no_webkit:
+        return "chromium", use_edge(silent, force_chromium)
+    return "webkit", False
+
+
+def real_viewport_size(p: Playwright, low_memory: bool = False) -> dict | None:
+    """
+    Get the real (device pixels) screen size of the emulated iPhone, or None
+    in low memory mode.
+    """
+    if low_memory:
+        logging.warning("Ignoring --m-real-viewport in low memory mode.")
+        return None
+    iphone = p.devices["iPhone 13 Pro Max"]
+    return {
+        "width": iphone["viewport"]["width"] * iphone["device_scale_factor"],
+        "height": iphone["viewport"]["height"] * iphone["device_scale_factor"],
+    }
+
+
+def log_phase_stats(phase: str, blocker: ResourceBlocker | None):
+    if blocker:
+        blocker.log_stats(phase, report)
+    log_browser_memory(phase, report)
+
+
+def launch_pc(
+    pool: BrowserPool,
     silent: bool = False,
     force_chromium: bool = False,
     use_search_v2: bool = False,
+    store: CookieStore | None = None,
+    blocker: ResourceBlocker | None = None,
+    base_url: str = BING_URL,
+    login_url: str = LOGIN_URL,
+    low_memory: bool = False,
 ):
+    """
+    Run the PC searches.
+
+    Cookies are loaded from and saved to store (cookies.json by default).
+    """
+    store = store or CookieStore()
     logging.info("Launching browser (PC version)...")
-    if silent or force_chromium:
-        browser = p.chromium.launch(headless=silent)
-    else:
-        browser = create_browser(p, silent)
+    browser = pool.get("chromium", try_edge=use_edge(silent, force_chromium))
     logging.info("Loading config & cookies...")
-    edge = p.devices["Desktop Edge"]
     context = browser.new_context(
-        **edge,
-        storage_state="cookies.json",
-        locale="vi-VN",
-        timezone_id="Asia/Ho_Chi_Minh",
+        **pc_context_options(pool.p, low_memory), storage_state=store.load()
     )
+    if blocker:
+        blocker.attach(context)
     page = context.new_page()
-    stealth_sync(page=page)
+    stealth(page)
     logging.info("Visiting Bing...")
-    page.goto("https://www.bing.com/")
+    with report.span("pc.goto"):
+        page.goto(base_url)
     Debug.screenshot(page, "bing-chromium-1")
     Debug.pause()
     wait(2, 3)
@@ -383,37 +720,36 @@ def launch_pc(
     page.locator("#id_l").click()
     Debug.pause()
     wait(1, 2)
-    check_session(page)
+    with report.span("pc.check_session"):
+        check_session(page, login_url)
+    # Keep the refreshed session even if something fails later on.
+    save_cookies(context, store, "pc")
     logging.info("Executing search function...")
     if use_search_v2:
         search_v2(page)
     else:
         search(page)
     Debug.pause()
+    log_phase_stats("PC", blocker)
     logging.info("Saving browser cookies...")
-    try:
-        context.storage_state(path="cookies.json")
-    except Error:
-        logging.exception("Error occurred while saving new cookies")
-        logging.warning("This may cause issues in the future.")
-    logging.info("Closing browser...")
-    browser.close()
+    save_cookies(context, store, "pc")
+    logging.info("Closing browser context...")
+    context.close()
 
 
-def get_mobile_edge_version() -> str:
-    rsp = requests.get("https://edgeupdates.microsoft.com/api/products")
-    rsp.raise_for_status()
-    data = rsp.json()
-    for release in data[0]["Releases"]:
-        if release["Platform"] == "iOS":
-            return release["ProductVersion"]
-    raise ValueError("No iOS version found.")
-
+def start_mobile(
+    page: Page,
+    use_search_v2: bool = False,
+    base_url: str = BING_URL,
+    login_url: str = LOGIN_URL,
+    store: CookieStore | None = None,
+):
+    from playwright.sync_api import TimeoutError
 
-def start_mobile(page: Page, use_search_v2: bool = False):
-    stealth_sync(page=page)
+    stealth(page)
     logging.info("Visiting Bing...")
-    page.goto("https://www.bing.com/")
+    with report.span("mobile.goto"):
+        page.goto(base_url)
     Debug.screenshot(page, "bing-webkit-1")
     Debug.pause()
     wait(1, 2)
@@ -426,7 +762,11 @@ def start_mobile(page: Page, use_search_v2: bool = False):
                 "Failed to click the 'Login' button, assuming we're logged in."
             )  # noqa: E501
     wait(3, 5)
-    check_session(page)
+    with report.span("mobile.check_session"):
+        check_session(page, login_url)
+    if store:
+        # Keep the refreshed session even if something fails later on.
+        save_cookies(page.context, store, "mobile")
     logging.info("Executing search function...")
     if use_search_v2:
         search_v2(page, True)
@@ -436,58 +776,49 @@ def start_mobile(page: Page, use_search_v2: bool = False):
 
 
 def launch_mobile(
-    p: Playwright,
+    pool: BrowserPool,
     silent: bool = False,
     no_webkit: bool = False,
     force_chromium: bool = False,
     real_viewport: bool = False,
     use_pc_profile: bool = False,
     use_search_v2: bool = False,
+    edge_version_ttl: float = EDGE_VERSION_TTL,
+    store: CookieStore | None = None,
+    blocker: ResourceBlocker | None = None,
+    base_url: str = BING_URL,
+    login_url: str = LOGIN_URL,
+    products_url: str = EDGE_PRODUCTS_URL,
+    low_memory: bool = False,
 ):
+    """
+    Run the mobile searches.
+
+    Cookies are loaded from and saved to store (cookies.json by default).
+    """
+    from bingto.edge import get_mobile_edge_version
+
+    store = store or CookieStore()
+    p = pool.p
     logging.info("Launching browser (1) (Mobile version)...")
-    if no_webkit:
-        browser = p.chromium
-    else:
-        browser = p.webkit
     logging.debug(p.devices)
-    if use_pc_profile:
-        iphone = p.devices["Desktop Edge"]
-    else:
-        iphone = p.devices["iPhone 13 Pro Max"]
-    edge_version = get_mobile_edge_version()
-    logging.info("Edge version: " + edge_version)
-    user_agent = EDGE_IOS_UA.format(
-        IOS_VERSION=choice(VALID_IOS_VERSIONS).replace(".", "_"), EDGE_VERSION=edge_version
-    )  # noqa: E501
-    logging.info(f"Crafted UA: {user_agent}")
-    logging.info("Monkey-patching WebKit user agent...")
-    iphone["user_agent"] = user_agent
-    if no_webkit and not force_chromium:
-        browser = create_browser(p, headless=silent, browser_type=browser)
-    else:
-        browser = browser.launch(headless=silent)
+    with report.span("mobile.edge_version"):
+        edge_version = get_mobile_edge_version(products_url, ttl=edge_version_ttl)
+    options = mobile_context_options(p, edge_version, use_pc_profile, low_memory)
+    browser = pool.get(*mobile_browser(no_webkit, silent, force_chromium))
     logging.info("Loading config & cookies...")
-    context = browser.new_context(
-        **iphone,
-        storage_state="cookies.json",
-        locale="vi-VN",
-        timezone_id="Asia/Ho_Chi_Minh",
-    )
+    context = browser.new_context(**options, storage_state=store.load())
+    if blocker:
+        blocker.attach(context)
     page = context.new_page()
-    if real_viewport:
-        iphone = p.devices["iPhone 13 Pro Max"]
-        width = iphone["viewport"]["width"] * iphone["device_scale_factor"]
-        height = iphone["viewport"]["height"] * iphone["device_scale_factor"]
-        page.set_viewport_size({"width": width, "height": height})
-    start_mobile(page, use_search_v2)
+    if real_viewport and (size := real_viewport_size(p, low_memory)):
+        page.set_viewport_size(size)
+    start_mobile(page, use_search_v2, base_url, login_url, store)
+    log_phase_stats("Mobile", blocker)
     logging.info("Saving browser cookies...")
-    try:
-        context.storage_state(path="cookies.json")
-    except Error:
-        logging.exception("Error occurred while saving new cookies")
-        logging.warning("This may cause issues in the future.")
-    logging.info("Closing browser...")
-    browser.close()
+    save_cookies(context, store, "mobile")
+    logging.info("Closing browser context...")
+    context.close()
 
 
 def install_deps():
@@ -500,6 +831,84 @@ def install_deps():
     logging.info("Dependencies installed.")
 
 
+def run(args: argparse.Namespace):
+    """
+    Run the PC and mobile phases as configured by args.
+    """
+    from playwright.sync_api import sync_playwright
+
+    def make_blocker() -> ResourceBlocker | None:
+        if args.lite:
+            return ResourceBlocker(args.block_resource_types, args.block_domains)
+        if args.report:
+            # Count the loaded bytes so the report can be compared with --lite.
+            return ResourceBlocker(block=False)
+        return None
+
+    with sync_playwright() as p:
+        pool = BrowserPool(p, args.silent, args.low_memory)
+        # Cookies are read once and kept in memory between the phases.
+        store = CookieStore()
+        try:
+            # PC
+            if not args.skip_pc:
+                launch_pc(
+                    pool,
+                    args.silent,
+                    args.force_chromium,
+                    args.use_search_v2,
+                    store,
+                    make_blocker(),
+                    args.bing_url,
+                    args.login_url,
+                    args.low_memory,
+                )
+            if args.skip_mobile or not args.no_webkit:
+                # Don't keep Chromium running next to WebKit.
+                pool.release("chromium")
+            # Mobile
+            if not args.skip_mobile:
+                launch_mobile(
+                    pool,
+                    args.silent,
+                    args.no_webkit,
+                    args.force_chromium,
+                    args.m_real_viewport,
+                    args.m_use_pc_profile,
+                    args.use_search_v2,
+                    args.m_edge_version_ttl * 3600,
+                    store,
+                    make_blocker(),
+                    args.bing_url,
+                    args.login_url,
+                    args.edge_products_url,
+                    args.low_memory,
+                )
+        finally:
+            logging.info("Closing browser...")
+            pool.close()
+
+
+def save_profile(profiler: cProfile.Profile, path: str):
+    """
+    Save the cProfile stats to path and log the slowest functions.
+    """
+    import io
+    import pstats
+
+    profiler.dump_stats(path)
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(20)
+    logging.info(f"Profile saved to {path}, top functions:\n{stream.getvalue()}")
+
+
+def non_negative_int(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or more, got {number}")
+    return number
+
+
 def main():
     global DEBUG, DEBUG_PAUSE
     parser = argparse.ArgumentParser(
@@ -534,6 +943,17 @@ def main():
     parser.add_argument(
         "--debug-pause", action="store_true", help="Enable debug mode & pausing.", default=False
     )
+    parser.add_argument(
+        "--debug-dir",
+        help="Where to save debug captures when a step fails.",
+        default=DEFAULT_CAPTURE_DIR,
+    )
+    parser.add_argument(
+        "--debug-captures",
+        type=non_negative_int,
+        help="How many debug captures to keep in memory (0 to disable them).",
+        default=DEFAULT_CAPTURE_SIZE,
+    )
     parser.add_argument(
         "--no-webkit",
         action="store_true",
@@ -554,6 +974,63 @@ def main():
         action="store_true",
         help="Use new search method (DOES NOT WORK).",
     )
+    parser.add_argument(
+        "--async",
+        action="store_true",
+        dest="use_async",
+        help="Use the async Playwright engine.",
+    )
+    parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        help="Reduce browser memory usage (for hosts with ~1 GB of RAM).",
+    )
+    parser.add_argument(
+        "--lite",
+        action="store_true",
+        help="Block resources that aren't needed to search (images, fonts, ads...)."
+        " This also disables the browser cache, compare the loaded bytes in"
+        " --report with and without it.",
+    )
+    parser.add_argument(
+        "--block-resource-types",
+        type=lambda x: [t.strip() for t in x.split(",") if t.strip()],
+        help="Comma-separated resource types to block in lite mode.",
+        default=DEFAULT_BLOCKED_RESOURCE_TYPES,
+    )
+    parser.add_argument(
+        "--block-domains",
+        type=lambda x: [d.strip() for d in x.split(",") if d.strip()],
+        help="Comma-separated domains to block in lite mode.",
+        default=DEFAULT_BLOCKED_DOMAINS,
+    )
+    parser.add_argument(
+        "--bing-url",
+        help="Base URL of Bing (e.g. a local replay server).",
+        default=BING_URL,
+    )
+    parser.add_argument(
+        "--login-url",
+        help="URL of the Microsoft account login page.",
+        default=LOGIN_URL,
+    )
+    parser.add_argument(
+        "--edge-products-url",
+        help="URL of the Edge releases API, used to get the Edge for iOS version.",
+        default=EDGE_PRODUCTS_URL,
+    )
+    parser.add_argument(
+        "--report",
+        help="Write the JSON run report to this file instead of logging it.",
+        default=None,
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="bingto.prof",
+        help="Profile the run with cProfile and save the stats (default: bingto.prof).",
+        default=None,
+    )
     # Mobile-only args
     parser.add_argument(
         "--m-real-viewport",
@@ -565,11 +1042,22 @@ def main():
         action="store_true",
         help="Uses PC profile instead of phone as a base (Mobile only).",
     )
+    parser.add_argument(
+        "--m-edge-version-ttl",
+        type=float,
+        help="Hours to cache the Edge for iOS version for (Mobile only).",
+        default=EDGE_VERSION_TTL / 3600,
+    )
     args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(name)s (%(funcName)s) (%(filename)s:%(lineno)d) [%(levelname)s]: %(message)s",
+    )  # noqa: E501
     DEBUG = args.debug
     DEBUG_PAUSE = args.debug_pause
     if DEBUG:
         logging.getLogger().setLevel(logging.DEBUG)
+        capture.configure(args.debug_dir, args.debug_captures)
     logging.info(f"Bingto {__version__} - https://github.com/teppyboy/bingto")
     if args.install:
         install_deps()
@@ -578,19 +1066,24 @@ def main():
         init_fake_playwright_stealth()
     if not Path("cookies.json").exists():
         logging.info("Cookies file not found.")
-        login()
-    with sync_playwright() as p:
-        # PC
-        if not args.skip_pc:
-            launch_pc(p, args.silent, args.force_chromium, args.use_search_v2)
-        # Mobile
-        if not args.skip_mobile:
-            launch_mobile(
-                p,
-                args.silent,
-                args.no_webkit,
-                args.force_chromium,
-                args.m_real_viewport,
-                args.m_use_pc_profile,
-                args.use_search_v2,
-            )
+        login(args.login_url)
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        if args.use_async:
+            import asyncio
+            from bingto import aio
+
+            asyncio.run(aio.run(args))
+        else:
+            run(args)
+    finally:
+        if profiler:
+            profiler.disable()
+            save_profile(profiler, args.profile)
+        report.dump(args.report)
+        capture.close()
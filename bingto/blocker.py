@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    from playwright.sync_api import BrowserContext, Request, Route
+    from playwright.async_api import BrowserContext as AsyncBrowserContext
+    from playwright.async_api import Request as AsyncRequest
+    from playwright.async_api import Route as AsyncRoute
+    from bingto.report import Report
+
+# get_score() and type_query() only need the DOM and the scripts driving it.
+DEFAULT_BLOCKED_RESOURCE_TYPES = ["image", "media", "font"]
+DEFAULT_BLOCKED_DOMAINS = [
+    "doubleclick.net",
+    "googlesyndication.com",
+    "adnxs.com",
+    "taboola.com",
+    "outbrain.com",
+]
+
+
+def format_bytes(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+class ResourceBlocker:
+    """
+    Abort requests that aren't needed to search, and count what was loaded.
+
+    Routing requests has a cost: Playwright disables the HTTP cache of a
+    context as soon as it is routed, so scripts and stylesheets are downloaded
+    again on every page, and every request makes a round trip through Python.
+    Whether blocking saves bandwidth overall depends on the page, so compare
+    the loaded bytes of runs with and without it.
+
+    With block=False nothing is routed (the cache stays on) and the loaded
+    bytes are only counted, as a baseline. Blocked requests never reach the
+    network, so their size can't be counted directly.
+    """
+
+    def __init__(
+        self,
+        resource_types: list[str] = DEFAULT_BLOCKED_RESOURCE_TYPES,
+        domains: list[str] = DEFAULT_BLOCKED_DOMAINS,
+        block: bool = True,
+    ):
+        self.resource_types = set(resource_types)
+        self.domains = tuple(domain.lower().lstrip(".") for domain in domains)
+        self.block = block
+        self.blocked = Counter()
+        self.loaded_requests = 0
+        self.loaded_bytes = 0
+
+    def is_blocked_domain(self, url: str) -> bool:
+        host = (urlsplit(url).hostname or "").lower()
+        return any(
+            host == domain or host.endswith("." + domain) for domain in self.domains
+        )
+
+    def should_block(self, request: Request) -> bool:
+        return request.resource_type in self.resource_types or self.is_blocked_domain(
+            request.url
+        )
+
+    def handle_route(self, route: Route):
+        request = route.request
+        if self.should_block(request):
+            self.blocked[request.resource_type] += 1
+            route.abort("blockedbyclient")
+        else:
+            route.continue_()
+
+    def count_loaded(self, sizes: dict[str, int]):
+        # Bytes received over the network (compressed, 0 if served from the
+        # cache), which Content-Length doesn't give for chunked responses.
+        self.loaded_requests += 1
+        self.loaded_bytes += sizes["responseHeadersSize"] + sizes["responseBodySize"]
+
+    def handle_request_finished(self, request: Request):
+        from playwright.sync_api import Error
+
+        try:
+            self.count_loaded(request.sizes())
+        except Error:
+            # The page was closed in the meantime.
+            pass
+
+    def attach(self, context: BrowserContext):
+        """
+        Start filtering (if block is True) and counting every page of the
+        context.
+        """
+        if self.block:
+            context.route("**/*", self.handle_route)
+        context.on("requestfinished", self.handle_request_finished)
+
+    def log_stats(self, phase: str, report: Report | None = None):
+        blocked = sum(self.blocked.values())
+        loaded = (
+            f"loaded {format_bytes(self.loaded_bytes)}"
+            f" in {self.loaded_requests} requests"
+        )
+        if self.block:
+            by_type = ", ".join(f"{k}: {v}" for k, v in self.blocked.most_common())
+            logging.info(
+                f"Lightweight mode ({phase}): blocked {blocked} requests"
+                + (f" ({by_type})" if by_type else "")
+                + f", {loaded}."
+            )
+        else:
+            logging.info(f"Network usage ({phase}): {loaded}.")
+        if report:
+            report.gauge(f"{phase.lower()}.loaded_bytes", self.loaded_bytes)
+            report.gauge(f"{phase.lower()}.loaded_requests", self.loaded_requests)
+            report.gauge(f"{phase.lower()}.blocked_requests", blocked)
+
+
+class AsyncResourceBlocker(ResourceBlocker):
+    """
+    ResourceBlocker for contexts created with the async Playwright API.
+    """
+
+    async def handle_route(self, route: AsyncRoute):
+        request = route.request
+        if self.should_block(request):
+            self.blocked[request.resource_type] += 1
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    async def handle_request_finished(self, request: AsyncRequest):
+        from playwright.async_api import Error
+
+        try:
+            self.count_loaded(await request.sizes())
+        except Error:
+            pass
+
+    async def attach(self, context: AsyncBrowserContext):
+        """
+        Start filtering (if block is True) and counting every page of the
+        context.
+        """
+        if self.block:
+            await context.route("**/*", self.handle_route)
+        context.on("requestfinished", self.handle_request_finished)
@@ -0,0 +1,124 @@
+import json
+import logging
+import re
+import time
+from collections import deque
+from pathlib import Path
+from typing import NamedTuple
+
+DEFAULT_CAPTURE_DIR = "debug"
+DEFAULT_CAPTURE_SIZE = 10
+# Milliseconds, a capture must never hold up the run for long.
+SCREENSHOT_TIMEOUT = 5000
+
+
+class Snapshot(NamedTuple):
+    index: int
+    name: str
+    taken_at: float
+    url: str
+    screenshot: bytes | None
+    html: str | None
+
+
+def slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:48]
+
+
+class DebugCapture:
+    """
+    Ring buffer of the last page snapshots (screenshot + DOM) taken in debug
+    mode.
+
+    Snapshots are taken by the caller, since Playwright objects can't be used
+    from other threads, and kept in memory. They're only written to disk, by a
+    background thread, when dump() is called after a step failed.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path = DEFAULT_CAPTURE_DIR,
+        size: int = DEFAULT_CAPTURE_SIZE,
+    ):
+        self.directory = Path(directory)
+        self.snapshots: deque[Snapshot] = deque(maxlen=size)
+        self._index = 0
+        self._dumps = 0
+        self._executor = None
+
+    def configure(self, directory: str | Path, size: int):
+        self.directory = Path(directory)
+        self.snapshots = deque(self.snapshots, maxlen=size)
+
+    def add(self, name: str, url: str, screenshot: bytes | None, html: str | None):
+        self._index += 1
+        self.snapshots.append(
+            Snapshot(self._index, name, time.time(), url, screenshot, html)
+        )
+
+    def dump(self, reason: str) -> Path | None:
+        """
+        Write the buffered snapshots to a new directory in the background and
+        empty the buffer.
+
+        Returns the directory, or None if there was nothing to write.
+        """
+        if not self.snapshots:
+            return None
+        # Only needed once something fails, keep it out of the startup path.
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._dumps += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = self.directory / f"{stamp}-{self._dumps:03d}-{slugify(reason)}"
+        snapshots = list(self.snapshots)
+        self.snapshots.clear()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="bingto-capture"
+            )
+        self._executor.submit(self._write, path, reason, snapshots)
+        logging.warning(
+            f"{reason}, saving the last {len(snapshots)} debug captures to {path}"
+        )
+        return path
+
+    def close(self):
+        """
+        Wait for the pending dumps to be written.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    @staticmethod
+    def _write(path: Path, reason: str, snapshots: list[Snapshot]):
+        try:
+            path.mkdir(parents=True, exist_ok=True)
+            manifest = {"reason": reason, "snapshots": []}
+            for snapshot in snapshots:
+                stem = f"{snapshot.index:03d}-{slugify(snapshot.name)}"
+                files = []
+                if snapshot.screenshot is not None:
+                    path.joinpath(f"{stem}.png").write_bytes(snapshot.screenshot)
+                    files.append(f"{stem}.png")
+                if snapshot.html is not None:
+                    path.joinpath(f"{stem}.html").write_text(
+                        snapshot.html, encoding="utf-8"
+                    )
+                    files.append(f"{stem}.html")
+                manifest["snapshots"].append(
+                    {
+                        "name": snapshot.name,
+                        "taken_at": snapshot.taken_at,
+                        "url": snapshot.url,
+                        "files": files,
+                    }
+                )
+            with open(path / "manifest.json", "w") as f:
+                json.dump(manifest, f, indent=2)
+        except OSError:
+            logging.exception(f"Failed to save debug captures to {path}")
+
+
+capture = DebugCapture()
@@ -1,4 +1,5 @@
-from english_words import get_english_words_set
+import os
+from pathlib import Path
 
 VALID_IOS_VERSIONS = [
     # 15
@@ -56,4 +57,20 @@ VALID_IOS_VERSIONS = [
     "17.1.1",
 ]
 EDGE_IOS_UA = "Mozilla/5.0 (iPhone; CPU iPhone OS {IOS_VERSION} like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 EdgiOS/{EDGE_VERSION} Mobile/15E148 Safari/605.1.15"  # noqa: E501
-WORD_LIST = get_english_words_set(["web2"], lower=True)
+BING_URL = "https://www.bing.com/"
+LOGIN_URL = "https://login.live.com/login.srf"
+EDGE_PRODUCTS_URL = "https://edgeupdates.microsoft.com/api/products"
+# The iOS Edge version only changes every few weeks.
+EDGE_VERSION_TTL = 24 * 60 * 60
+CACHE_DIR = (
+    Path(os.getenv("XDG_CACHE_HOME") or Path.home().joinpath(".cache")) / "bingto"
+)
+
+
+def __getattr__(name: str):
+    # WORD_LIST used to be built at import time, keep it available lazily.
+    if name == "WORD_LIST":
+        from bingto.wordlist import get_word_list
+
+        return get_word_list()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
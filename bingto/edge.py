@@ -0,0 +1,100 @@
+import json
+import logging
+import os
+import requests
+import time
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from bingto.constant import CACHE_DIR, EDGE_PRODUCTS_URL, EDGE_VERSION_TTL
+
+EDGE_VERSION_CACHE_PATH = CACHE_DIR / "edge_version.json"
+
+_session = None
+
+
+def get_session() -> requests.Session:
+    """
+    Get the shared, connection-pooled HTTP session.
+    """
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=2)
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+    return _session
+
+
+def load_cache(path: Path) -> dict:
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or not cache.get("version"):
+        return {}
+    return cache
+
+
+def save_cache(path: Path, cache: dict):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.warning(f"Failed to save Edge version cache: {e}")
+
+
+def parse_ios_version(data: list) -> str:
+    for release in data[0]["Releases"]:
+        if release["Platform"] == "iOS":
+            return release["ProductVersion"]
+    raise ValueError("No iOS version found.")
+
+
+def get_mobile_edge_version(
+    url: str = EDGE_PRODUCTS_URL,
+    cache_path: Path = EDGE_VERSION_CACHE_PATH,
+    ttl: float = EDGE_VERSION_TTL,
+) -> str:
+    """
+    Get the latest Edge version for iOS.
+
+    The result is cached in cache_path for ttl seconds, after that the cached
+    value is revalidated with ETag/Last-Modified. If the request fails, the
+    last known version is used instead.
+    """
+    cache = load_cache(cache_path)
+    if cache.get("url", EDGE_PRODUCTS_URL) != url:
+        # Fetched from another server (e.g. the replay stand-in).
+        cache = {}
+    if cache and time.time() - cache.get("fetched_at", 0) < ttl:
+        logging.debug("Using cached Edge version.")
+        return cache["version"]
+    headers = {}
+    if cache.get("etag"):
+        headers["If-None-Match"] = cache["etag"]
+    if cache.get("last_modified"):
+        headers["If-Modified-Since"] = cache["last_modified"]
+    try:
+        rsp = get_session().get(url, headers=headers, timeout=10)
+        if rsp.status_code == 304 and cache:
+            logging.debug("Cached Edge version is still valid.")
+        else:
+            rsp.raise_for_status()
+            cache = {
+                "url": url,
+                "version": parse_ios_version(rsp.json()),
+                "etag": rsp.headers.get("ETag"),
+                "last_modified": rsp.headers.get("Last-Modified"),
+            }
+    except (requests.RequestException, ValueError, KeyError, IndexError) as e:
+        if not cache:
+            raise
+        logging.warning(f"Failed to fetch Edge version, using last known: {e}")
+        return cache["version"]
+    cache["fetched_at"] = time.time()
+    save_cache(cache_path, cache)
+    return cache["version"]
@@ -0,0 +1,124 @@
+import logging
+import os
+from pathlib import Path
+from bingto.report import Report
+
+# Chromium/Edge switches that trade speed and isolation for a smaller
+# footprint, for hosts with ~1 GB of RAM. Playwright already disables
+# background networking, extensions, sync etc. by default, and passes its
+# own --disable-features list: Chromium only honours the last one, so none
+# is added here.
+LOW_MEMORY_CHROMIUM_ARGS = [
+    "--disable-gpu",
+    "--disable-gpu-compositing",
+    "--disable-software-rasterizer",
+    "--disable-accelerated-2d-canvas",
+    "--disk-cache-size=1048576",
+    "--media-cache-size=1048576",
+    "--renderer-process-limit=1",
+    # Only turns off field-trial isolation, full site isolation can only be
+    # turned off with --disable-features.
+    "--disable-site-isolation-trials",
+    "--mute-audio",
+    "--js-flags=--max-old-space-size=256",
+]
+# The smallest viewports that still get the layouts get_score() and
+# type_query() expect.
+LOW_MEMORY_PC_VIEWPORT = {"width": 1024, "height": 640}
+LOW_MEMORY_MOBILE_VIEWPORT = {"width": 375, "height": 667}
+
+
+def low_memory_launch_options(browser_name: str) -> dict:
+    """
+    Get the extra launch options for a browser in low memory mode.
+    """
+    if browser_name == "chromium":
+        return {"args": LOW_MEMORY_CHROMIUM_ARGS}
+    # WebKit has no equivalent switches, the context options do the work.
+    return {}
+
+
+def low_memory_context_options(device: dict, mobile: bool) -> dict:
+    """
+    Shrink a Playwright device descriptor for low memory mode.
+    """
+    options = dict(device)
+    viewport = LOW_MEMORY_MOBILE_VIEWPORT if mobile else LOW_MEMORY_PC_VIEWPORT
+    options["viewport"] = viewport
+    options["screen"] = viewport
+    options["device_scale_factor"] = 1
+    options["service_workers"] = "block"
+    options["reduced_motion"] = "reduce"
+    return options
+
+
+def read_status(pid: int) -> dict[str, str]:
+    status = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            status[key] = value.strip()
+    return status
+
+
+def child_processes(pid: int = None) -> list[int]:
+    """
+    Get all descendants of pid (this process by default) from /proc.
+    """
+    pid = pid or os.getpid()
+    parents: dict[int, list[int]] = {}
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            ppid = int(read_status(int(entry.name))["PPid"])
+        except (OSError, KeyError, ValueError):
+            continue
+        parents.setdefault(ppid, []).append(int(entry.name))
+    descendants = []
+    stack = [pid]
+    while stack:
+        for child in parents.get(stack.pop(), []):
+            descendants.append(child)
+            stack.append(child)
+    return descendants
+
+
+def browser_memory() -> tuple[int, int, int] | None:
+    """
+    Get the peak and current RSS (in bytes) of the Playwright driver and
+    browser processes, and how many there are.
+
+    Peak RSS is the sum of each process' own peak, so it's an upper bound.
+    Returns None if /proc isn't available (not Linux).
+    """
+    if not Path("/proc/self/status").exists():
+        return None
+    peak = current = count = 0
+    for pid in child_processes():
+        try:
+            status = read_status(pid)
+            peak += int(status["VmHWM"].split()[0]) * 1024
+            current += int(status["VmRSS"].split()[0]) * 1024
+            count += 1
+        except (OSError, KeyError, ValueError, IndexError):
+            # Exited in the meantime, or a kernel thread.
+            continue
+    return peak, current, count
+
+
+def log_browser_memory(phase: str, report: Report):
+    """
+    Log the browser memory usage at the end of a phase and add it to report.
+    """
+    memory = browser_memory()
+    if memory is None:
+        logging.info("Browser memory usage is only available on Linux.")
+        return
+    peak, current, count = memory
+    logging.info(
+        f"Browser memory ({phase}): peak RSS {peak / 1024 / 1024:.1f} MiB,"
+        f" current RSS {current / 1024 / 1024:.1f} MiB ({count} processes)."
+    )
+    report.gauge(f"{phase.lower()}.browser_peak_rss", peak)
+    report.gauge(f"{phase.lower()}.browser_rss", current)
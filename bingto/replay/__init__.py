@@ -0,0 +1,6 @@
+"""
+Offline stand-in for Bing, used to exercise bingto without network access.
+"""
+from bingto.replay.server import FIXTURES_DIR, ReplayServer, ReplayState
+
+__all__ = ["FIXTURES_DIR", "ReplayServer", "ReplayState"]
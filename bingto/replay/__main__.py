@@ -0,0 +1,43 @@
+import argparse
+import logging
+from bingto.replay import ReplayServer, ReplayState
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="bingto.replay",
+        description="Serve a local stand-in for Bing.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--score", type=int, default=0, help="Starting score.")
+    parser.add_argument(
+        "--max-points", type=int, default=50, help="Points available from searches."
+    )
+    parser.add_argument(
+        "--session-expired",
+        action="store_true",
+        help="Redirect the 'Login' button to the login page.",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    state = ReplayState(
+        score=args.score,
+        max_points=args.max_points,
+        session_expired=args.session_expired,
+    )
+    server = ReplayServer(args.host, args.port, state)
+    logging.info(
+        f"Serving on {server.url}, run bingto with "
+        f"--bing-url {server.url} --login-url {server.login_url}"
+        f" --edge-products-url {server.products_url}"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+main()
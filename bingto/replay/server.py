@@ -0,0 +1,244 @@
+import hashlib
+import logging
+import mimetypes
+import secrets
+import threading
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from string import Template
+from urllib.parse import parse_qs, quote, urlsplit
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+class ReplayState:
+    """
+    Mutable state of the fake Bing account served by ReplayServer.
+    """
+
+    def __init__(
+        self,
+        score: int = 0,
+        points_per_search: int = 5,
+        max_points: int = 50,
+        session_expired: bool = False,
+    ):
+        self.score = score
+        self.start_score = score
+        self.points_per_search = points_per_search
+        self.max_points = max_points
+        self.session_expired = session_expired
+        self.searches = 0
+        self.lock = threading.Lock()
+        self._tokens: set[str] = set()
+
+    def issue_token(self) -> str:
+        """
+        Get a token for a search form, each one is only good for one search.
+        """
+        token = secrets.token_hex(8)
+        with self.lock:
+            self._tokens.add(token)
+        return token
+
+    def search(self, query: str, token: str) -> bool:
+        """
+        Count a search and award its points, unless token was already used.
+
+        Reloading a results page (e.g. going back to it) sends the same token
+        again, and shouldn't earn points twice.
+        """
+        with self.lock:
+            if token not in self._tokens:
+                return False
+            self._tokens.remove(token)
+            self.searches += 1
+            if self.score - self.start_score < self.max_points:
+                self.score += self.points_per_search
+            return True
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    server: "ReplayServer"
+
+    def log_message(self, format, *args):
+        logging.debug("Replay server: " + format % args)
+
+    def send_body(
+        self,
+        body: str | bytes,
+        content_type: str,
+        status: int = 200,
+        headers: dict[str, str] = None,
+    ):
+        if isinstance(body, str):
+            body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {"Cache-Control": "no-store"}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_static(self, name: str):
+        # Cacheable like Bing's own scripts & stylesheets, see ResourceBlocker.
+        path = self.server.fixtures_dir / "static" / Path(name).name
+        if not path.is_file():
+            self.send_body("Not found", "text/plain", 404)
+            return
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        self.send_body(
+            path.read_bytes(),
+            content_type,
+            headers={"Cache-Control": "public, max-age=86400"},
+        )
+
+    def send_products(self):
+        body = self.server.fixture("products.json").template.encode()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        self.server.products_requests += 1
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_body(
+            body,
+            "application/json",
+            headers={"ETag": etag, "Cache-Control": "no-cache"},
+        )
+
+    def redirect(self, location: str):
+        self.send_response(302)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def render_page(self, title: str, query: str = "", results: str = "") -> str:
+        return self.server.fixture("page.html").safe_substitute(
+            title=escape(title),
+            query=escape(query),
+            results=results,
+            score_delay=self.server.score_delay,
+            token=self.server.state.issue_token(),
+        )
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        query = params.get("q", [""])[0]
+        state = self.server.state
+        match url.path:
+            case "/":
+                self.send_body(self.render_page("Bing"), "text/html")
+            case "/search":
+                state.search(query, params.get("token", [""])[0])
+                results = "\n".join(
+                    self.server.fixture("result.html").safe_substitute(
+                        query=escape(query), n=n
+                    )
+                    for n in range(1, 6)
+                )
+                page = self.render_page(f"{query} - Search", query, results)
+                self.send_body(page, "text/html")
+            case "/result":
+                self.send_body(self.render_page(f"{query} - Result", query), "text/html")
+            case "/AS/Suggestions":
+                prefix = params.get("qry", [""])[0]
+                suggestions = "\n".join(
+                    self.server.fixture("suggestion.html").safe_substitute(
+                        suggestion=escape(f"{prefix} {n}")
+                    )
+                    for n in range(1, 9)
+                )
+                self.send_body(suggestions, "text/html")
+            case "/rewards/score":
+                self.send_body(str(state.score), "text/plain")
+            case "/secure/Passport.aspx":
+                if state.session_expired:
+                    # Bing sends the return URL lowercase-escaped.
+                    wreply = quote("https://www.bing.com/secure/Passport.aspx", safe="")
+                    wreply = wreply.replace("%3A", "%3a").replace("%2F", "%2f")
+                    self.redirect(f"{self.server.login_url}?wreply={wreply}")
+                else:
+                    self.redirect("/")
+            case "/login.srf":
+                self.send_body(
+                    self.server.fixture("login.html").template, "text/html"
+                )
+            case "/api/products":
+                self.send_products()
+            case path if path.startswith("/static/"):
+                self.send_static(path.removeprefix("/static/"))
+            case _:
+                self.send_body("Not found", "text/plain", 404)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Local stand-in for Bing serving the HTML fixtures in fixtures_dir.
+
+    Use it as a context manager to serve from a background thread:
+
+        with ReplayServer() as server:
+            launch_pc(pool, base_url=server.url, login_url=server.login_url)
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        state: ReplayState = None,
+        fixtures_dir: Path = FIXTURES_DIR,
+        score_delay: int = 300,
+    ):
+        super().__init__((host, port), ReplayHandler)
+        self.state = state or ReplayState()
+        self.fixtures_dir = Path(fixtures_dir)
+        self.score_delay = score_delay
+        self._fixtures: dict[str, Template] = {}
+        self._thread = None
+        self.products_requests = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def login_url(self) -> str:
+        return self.url + "login.srf"
+
+    @property
+    def products_url(self) -> str:
+        return self.url + "api/products"
+
+    def fixture(self, name: str) -> Template:
+        if name not in self._fixtures:
+            text = self.fixtures_dir.joinpath(name).read_text()
+            self._fixtures[name] = Template(text)
+        return self._fixtures[name]
+
+    def start(self):
+        # Poll often so stop() doesn't hold up every benchmark run.
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "ReplayServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,90 @@
+import json
+import logging
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from bingto import __version__
+
+
+class Report:
+    """
+    Collect per-phase timings, retry counts and scores for a run.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.spans: dict[str, list[float]] = defaultdict(list)
+        self.counters = Counter()
+        self.scores: dict[str, dict[str, int]] = {}
+        self.gauges: dict[str, float] = {}
+
+    @contextmanager
+    def span(self, name: str):
+        """
+        Time the enclosed block and record it under name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans[name].append(time.perf_counter() - start)
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def gauge(self, name: str, value: float):
+        """
+        Record a measurement (e.g. memory usage), keeping the latest one.
+        """
+        self.gauges[name] = value
+
+    def score(self, phase: str, score: int):
+        """
+        Record a score read during phase, keeping the first and last one.
+        """
+        if score == -1:
+            return
+        scores = self.scores.setdefault(phase, {"start": score})
+        scores["end"] = score
+        scores["delta"] = score - scores["start"]
+
+    def to_dict(self) -> dict:
+        phases = {}
+        for name, durations in self.spans.items():
+            phases[name] = {
+                "count": len(durations),
+                "total": round(sum(durations), 3),
+                "min": round(min(durations), 3),
+                "max": round(max(durations), 3),
+                "mean": round(sum(durations) / len(durations), 3),
+            }
+        return {
+            "version": __version__,
+            "started_at": self.started_at,
+            "duration": round(time.time() - self.started_at, 3),
+            "phases": phases,
+            "retries": dict(self.counters),
+            "scores": self.scores,
+            "gauges": self.gauges,
+        }
+
+    def dump(self, path: Path | None = None):
+        """
+        Write the report to path as JSON, or log it if path is None.
+        """
+        data = self.to_dict()
+        if path is None:
+            logging.info(f"Run report: {json.dumps(data)}")
+            return
+        # Called from a finally block, don't hide the run's own exception.
+        try:
+            with open(path, "w") as f:
+                json.dump(data, f, indent=2)
+        except OSError:
+            logging.exception(f"Failed to save the run report to {path}")
+            return
+        logging.info(f"Run report saved to {path}")
+
+
+report = Report()
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+
+class CookieStore:
+    """
+    In-memory copy of the browser storage state (cookies.json).
+
+    The file is parsed once and only rewritten when the state actually
+    changed, atomically (temporary file + rename) so a crash can't leave a
+    half-written file behind.
+
+    replace() only touches the in-memory state, so the next phase sees the
+    new cookies right away, and flush() writes it; update() does both.
+    """
+
+    def __init__(self, path: str | Path = "cookies.json", state: dict = None):
+        self.path = Path(path)
+        self._state = state
+        self._digest = None if state is None else self.digest(state)
+        # Digest of the state in the file, None if unknown.
+        self._written = None
+        self._lock = threading.Lock()
+        # Held while writing, so an older state can't overwrite a newer one.
+        self._write_lock = threading.Lock()
+
+    @staticmethod
+    def digest(state: dict) -> str:
+        data = json.dumps(state, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def exists(self) -> bool:
+        return self._state is not None or self.path.exists()
+
+    def load(self) -> dict:
+        """
+        Get the storage state, reading the file on first use.
+        """
+        with self._lock:
+            if self._state is None:
+                with open(self.path) as f:
+                    self._state = json.load(f)
+                self._digest = self._written = self.digest(self._state)
+            return self._state
+
+    def replace(self, state: dict) -> bool:
+        """
+        Replace the in-memory storage state, without writing it.
+
+        Returns True if it differs from the file, see flush().
+        """
+        digest = self.digest(state)
+        with self._lock:
+            self._state = state
+            self._digest = digest
+            return digest != self._written
+
+    def flush(self) -> bool:
+        """
+        Write the storage state to disk if it changed since the last write.
+
+        Returns True if the file was written.
+        """
+        with self._write_lock:
+            with self._lock:
+                state, digest = self._state, self._digest
+            if state is None or digest == self._written:
+                return False
+            self._write(state)
+            with self._lock:
+                self._written = digest
+        return True
+
+    def update(self, state: dict) -> bool:
+        """
+        Replace the storage state, writing it to disk if it changed.
+
+        The in-memory state is replaced even if writing fails (OSError).
+        Returns True if the file was written.
+        """
+        self.replace(state)
+        return self.flush()
+
+    def _write(self, state: dict):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"
+        )
+        # mkstemp creates the file readable by the owner only, which is what we
+        # want for login cookies.
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
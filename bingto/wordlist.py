@@ -0,0 +1,138 @@
+import logging
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from collections.abc import Sequence, Set
+from pathlib import Path
+from bingto.constant import CACHE_DIR
+
+# File layout: MAGIC, word count (uint32), count + 1 offsets (uint32) into
+# the data block, then the sorted words joined back-to-back as UTF-8.
+MAGIC = b"BTWL\x01"
+# Same words as the WORD_LIST set bingto.constant used to build at import.
+WORD_LIST_SOURCES = ["web2"]
+WORD_LIST_LOWER = True
+
+_word_list = None
+
+
+class WordList(Sequence, Set):
+    """
+    Read-only sorted word list backed by a memory-mapped file.
+
+    Works as a set of words (like the WORD_LIST set it replaces) as well as a
+    sequence, so random.choice() can pick from it directly.
+    """
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[: len(MAGIC)] != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a word list file.")
+        self._offsets = len(MAGIC) + 4
+        if not self._is_complete():
+            # Rebuilt by get_word_list(), instead of failing with struct.error.
+            self._mm.close()
+            raise ValueError(f"{path} is truncated.")
+        (self._count,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        self._data = self._offsets + (self._count + 1) * 4
+
+    def _is_complete(self) -> bool:
+        """
+        Check that the file is as long as its offset table says.
+        """
+        size = len(self._mm)
+        if size < self._offsets:
+            return False
+        (count,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        data = self._offsets + (count + 1) * 4
+        if size < data:
+            return False
+        (end,) = struct.unpack_from("<I", self._mm, data - 4)
+        return size == data + end
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> str:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("word list index out of range")
+        start, end = struct.unpack_from("<2I", self._mm, self._offsets + index * 4)
+        return self._mm[self._data + start : self._data + end].decode()
+
+    def __contains__(self, word: object) -> bool:
+        # The words are sorted, don't let Sequence scan all of them.
+        if not isinstance(word, str):
+            return False
+        index = bisect_left(self, word)
+        return index < self._count and self[index] == word
+
+    @classmethod
+    def _from_iterable(cls, iterable) -> set:
+        # Set operations (&, |, -, ^) return plain sets.
+        return set(iterable)
+
+    def close(self):
+        self._mm.close()
+
+
+def word_list_path() -> Path:
+    """
+    Get the cache path of the word list, one per english_words release so an
+    upgrade rebuilds it.
+    """
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        release = version("english-words")
+    except PackageNotFoundError:
+        release = "unknown"
+    return CACHE_DIR / f"web2_lower-{release}.wl"
+
+
+def build_word_list(path: Path):
+    """
+    Build the on-disk word list from the english_words package.
+    """
+    from english_words import get_english_words_set
+
+    logging.info(f"Building word list cache at {path}...")
+    words = [
+        word.encode()
+        for word in sorted(
+            get_english_words_set(WORD_LIST_SOURCES, lower=WORD_LIST_LOWER)
+        )
+    ]
+    offsets = [0]
+    for word in words:
+        offsets.append(offsets[-1] + len(word))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(words)))
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        f.write(b"".join(words))
+    os.replace(tmp_path, path)
+
+
+def get_word_list(path: Path | None = None) -> WordList:
+    """
+    Get the word list, building the on-disk cache on first use.
+    """
+    global _word_list
+    if _word_list is not None:
+        return _word_list
+    path = path or word_list_path()
+    try:
+        _word_list = WordList(path)
+    except (OSError, ValueError):
+        build_word_list(path)
+        _word_list = WordList(path)
+    return _word_list
@@ -0,0 +1,13 @@
+import pytest
+from bingto.replay import ReplayServer, ReplayState
+
+
+@pytest.fixture
+def replay_state() -> ReplayState:
+    return ReplayState(max_points=15)
+
+
+@pytest.fixture
+def replay_server(replay_state: ReplayState):
+    with ReplayServer(state=replay_state, score_delay=0) as server:
+        yield server
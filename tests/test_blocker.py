@@ -0,0 +1,30 @@
+from types import SimpleNamespace
+from bingto.blocker import ResourceBlocker
+from bingto.report import Report
+
+
+def request(url: str, resource_type: str = "document"):
+    return SimpleNamespace(url=url, resource_type=resource_type)
+
+
+def test_should_block():
+    blocker = ResourceBlocker(["image"], ["doubleclick.net"])
+    assert blocker.should_block(request("https://www.bing.com/th?id=1", "image"))
+    assert blocker.should_block(request("https://ad.doubleclick.net/x.js", "script"))
+    assert blocker.should_block(request("https://doubleclick.net/", "script"))
+    assert not blocker.should_block(request("https://notdoubleclick.net/", "script"))
+    assert not blocker.should_block(request("https://www.bing.com/search?q=a"))
+
+
+def test_log_stats_records_gauges():
+    blocker = ResourceBlocker(block=False)
+    blocker.count_loaded({"responseHeadersSize": 100, "responseBodySize": 900})
+    # Served from the cache.
+    blocker.count_loaded({"responseHeadersSize": 0, "responseBodySize": 0})
+    report = Report()
+    blocker.log_stats("PC", report)
+    assert report.gauges == {
+        "pc.loaded_bytes": 1000,
+        "pc.loaded_requests": 2,
+        "pc.blocked_requests": 0,
+    }
@@ -0,0 +1,49 @@
+import json
+from bingto.capture import DebugCapture
+
+
+def test_dump_keeps_the_last_captures(tmp_path):
+    capture = DebugCapture(tmp_path, size=2)
+    for n in range(1, 4):
+        capture.add(f"step {n}", "http://bing/", b"png", "<html></html>")
+    path = capture.dump("pc search 3: no score")
+    capture.close()
+    assert sorted(p.name for p in path.iterdir()) == [
+        "002-step-2.html",
+        "002-step-2.png",
+        "003-step-3.html",
+        "003-step-3.png",
+        "manifest.json",
+    ]
+    manifest = json.loads(path.joinpath("manifest.json").read_text())
+    assert manifest["reason"] == "pc search 3: no score"
+    assert [s["name"] for s in manifest["snapshots"]] == ["step 2", "step 3"]
+
+
+def test_dumps_never_overwrite_each_other(tmp_path):
+    capture = DebugCapture(tmp_path)
+    capture.add("a", "http://bing/", None, "<p></p>")
+    first = capture.dump("failed")
+    # Nothing new was captured since.
+    assert capture.dump("failed") is None
+    capture.add("b", "http://bing/", b"png", None)
+    second = capture.dump("failed")
+    capture.close()
+    assert first != second
+    assert [p.name for p in first.iterdir() if p.suffix != ".json"] == ["001-a.html"]
+    assert [p.name for p in second.iterdir() if p.suffix != ".json"] == ["002-b.png"]
+
+
+def test_configure_keeps_captures(tmp_path):
+    capture = DebugCapture(tmp_path, size=3)
+    for n in range(3):
+        capture.add(str(n), "http://bing/", None, None)
+    capture.configure(tmp_path, 1)
+    assert [s.name for s in capture.snapshots] == ["2"]
+
+
+def test_size_zero_disables_captures(tmp_path):
+    capture = DebugCapture(tmp_path, size=0)
+    capture.add("a", "http://bing/", b"png", "<p></p>")
+    assert capture.dump("failed") is None
+    assert not list(tmp_path.iterdir())
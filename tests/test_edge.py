@@ -0,0 +1,81 @@
+import json
+import time
+import pytest
+import requests
+from bingto.edge import get_mobile_edge_version, load_cache
+
+FIXTURE_VERSION = "120.0.2210.116"
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / "edge_version.json"
+
+
+def write_cache(path, **cache):
+    path.write_text(json.dumps(cache))
+
+
+def test_fresh_fetch(replay_server, cache_path):
+    version = get_mobile_edge_version(replay_server.products_url, cache_path)
+    assert version == FIXTURE_VERSION
+    cache = load_cache(cache_path)
+    assert cache["version"] == FIXTURE_VERSION
+    assert cache["url"] == replay_server.products_url
+    assert cache["etag"]
+    assert replay_server.products_requests == 1
+
+
+def test_within_ttl(replay_server, cache_path):
+    write_cache(
+        cache_path,
+        url=replay_server.products_url,
+        version="1.2.3",
+        fetched_at=time.time(),
+    )
+    assert get_mobile_edge_version(replay_server.products_url, cache_path) == "1.2.3"
+    assert replay_server.products_requests == 0
+
+
+def test_not_modified(replay_server, cache_path):
+    get_mobile_edge_version(replay_server.products_url, cache_path)
+    cache = load_cache(cache_path)
+    # Expired, but the ETag still matches: the cached value must be kept.
+    write_cache(cache_path, **{**cache, "version": "1.2.3", "fetched_at": 0})
+    assert get_mobile_edge_version(replay_server.products_url, cache_path) == "1.2.3"
+    assert replay_server.products_requests == 2
+    assert load_cache(cache_path)["fetched_at"] > time.time() - 60
+
+
+def test_changed_etag(replay_server, cache_path):
+    write_cache(
+        cache_path,
+        url=replay_server.products_url,
+        version="1.2.3",
+        etag='"outdated"',
+        fetched_at=0,
+    )
+    version = get_mobile_edge_version(replay_server.products_url, cache_path)
+    assert version == FIXTURE_VERSION
+
+
+def test_fetch_failure_uses_cache(replay_server, cache_path):
+    url = replay_server.products_url
+    write_cache(cache_path, url=url, version="1.2.3", fetched_at=0)
+    replay_server.stop()
+    assert get_mobile_edge_version(url, cache_path) == "1.2.3"
+
+
+def test_fetch_failure_without_cache(replay_server, cache_path):
+    url = replay_server.products_url
+    replay_server.stop()
+    with pytest.raises(requests.RequestException):
+        get_mobile_edge_version(url, cache_path)
+
+
+def test_cache_from_other_url_is_ignored(replay_server, cache_path):
+    write_cache(
+        cache_path, url="https://example.com/", version="1.2.3", fetched_at=time.time()
+    )
+    version = get_mobile_edge_version(replay_server.products_url, cache_path)
+    assert version == FIXTURE_VERSION
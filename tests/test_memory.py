@@ -0,0 +1,31 @@
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from bingto.memory import (
+    LOW_MEMORY_CHROMIUM_ARGS,
+    log_browser_memory,
+    low_memory_launch_options,
+)
+from bingto.report import Report
+
+
+def test_playwright_switches_are_kept():
+    # A second --disable-features would replace Playwright's own list.
+    assert not any(
+        arg.startswith(("--disable-features", "--enable-features"))
+        for arg in LOW_MEMORY_CHROMIUM_ARGS
+    )
+
+
+def test_launch_options():
+    assert low_memory_launch_options("chromium") == {"args": LOW_MEMORY_CHROMIUM_ARGS}
+    assert low_memory_launch_options("webkit") == {}
+
+
+@pytest.mark.skipif(not Path("/proc/self/status").exists(), reason="Linux only")
+def test_browser_memory_sums_child_processes():
+    with subprocess.Popen([sys.executable, "-c", "input()"], stdin=subprocess.PIPE):
+        report = Report()
+        log_browser_memory("PC", report)
+    assert report.gauges["pc.browser_peak_rss"] >= report.gauges["pc.browser_rss"] > 0
@@ -0,0 +1,87 @@
+import asyncio
+from bingto import aio, app
+
+
+class FakeBrowser:
+    def __init__(self, name: str, channel: str = None):
+        self.name = name
+        self.channel = channel
+        self.connected = True
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    def close(self):
+        self.connected = False
+
+
+class FakeBrowserType:
+    def __init__(self, name: str):
+        self.name = name
+        self.launched: list[FakeBrowser] = []
+
+    def launch(self, headless: bool, channel: str = None, **kwargs) -> FakeBrowser:
+        browser = FakeBrowser(self.name, channel)
+        self.launched.append(browser)
+        return browser
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeBrowserType("chromium")
+        self.webkit = FakeBrowserType("webkit")
+
+
+def test_phases_share_chromium():
+    p = FakePlaywright()
+    pool = app.BrowserPool(p, headless=True)
+    for silent in (False, True):
+        try_edge = app.use_edge(silent, force_chromium=False)
+        assert pool.get("chromium", try_edge) is pool.get("chromium", try_edge)
+    assert [b.channel for b in p.chromium.launched] == ["msedge", None]
+
+
+def test_release_closes_only_that_browser():
+    p = FakePlaywright()
+    pool = app.BrowserPool(p, headless=True)
+    chromium = pool.get("chromium")
+    webkit = pool.get("webkit")
+    pool.release("chromium")
+    assert not chromium.is_connected()
+    assert webkit.is_connected()
+    # Launched again if a later phase needs it after all.
+    assert pool.get("chromium") is not chromium
+    pool.close()
+    assert not webkit.is_connected()
+
+
+class AsyncFakeBrowser(FakeBrowser):
+    async def close(self):
+        self.connected = False
+
+
+class AsyncFakeBrowserType(FakeBrowserType):
+    async def launch(self, headless: bool, channel: str = None, **kwargs):
+        browser = AsyncFakeBrowser(self.name, channel)
+        self.launched.append(browser)
+        return browser
+
+
+def test_async_pool_release():
+    p = FakePlaywright()
+    p.chromium = AsyncFakeBrowserType("chromium")
+    p.webkit = AsyncFakeBrowserType("webkit")
+
+    async def main():
+        pool = aio.BrowserPool(p, headless=True)
+        chromium, same = await asyncio.gather(pool.get(), pool.get())
+        assert chromium is same
+        webkit = await pool.get("webkit")
+        await pool.release("chromium")
+        assert not chromium.is_connected()
+        assert webkit.is_connected()
+        await pool.close()
+        assert not webkit.is_connected()
+
+    asyncio.run(main())
+    assert len(p.chromium.launched) == 1
@@ -0,0 +1,117 @@
+import http.client
+import re
+from urllib.parse import urlsplit
+import pytest
+from bingto.replay import ReplayServer, ReplayState
+
+
+def get(server: ReplayServer, path: str, headers: dict = None):
+    host, port = server.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    try:
+        conn.request("GET", path, headers=headers or {})
+        rsp = conn.getresponse()
+        return rsp.status, dict(rsp.getheaders()), rsp.read().decode()
+    finally:
+        conn.close()
+
+
+def form_token(html: str) -> str:
+    return re.search(r'id="sb_token" name="token" type="hidden" value="(\w+)"', html)[1]
+
+
+def test_home_page(replay_server):
+    status, headers, body = get(replay_server, "/")
+    assert status == 200
+    assert headers["Cache-Control"] == "no-store"
+    for element in ("id_l", "id_rc", "mHamburger", "hb_s", "HBleft", "sb_form_q"):
+        assert f'id="{element}"' in body
+
+
+def test_search_awards_points_once_per_form(replay_server, replay_state):
+    token = form_token(get(replay_server, "/")[2])
+    status, _, body = get(replay_server, f"/search?q=ab+c&token={token}")
+    assert status == 200
+    assert body.count('class="tilk"') == 5
+    assert "ab c - Search" in body
+    assert (replay_state.searches, replay_state.score) == (1, 5)
+    # Going back to the results page reloads it with the same token.
+    get(replay_server, f"/search?q=ab+c&token={token}")
+    assert (replay_state.searches, replay_state.score) == (1, 5)
+    # The results page has a new form, good for the next search.
+    get(replay_server, f"/search?q=d&token={form_token(body)}")
+    assert (replay_state.searches, replay_state.score) == (2, 10)
+
+
+def test_search_stops_awarding_points_at_max(replay_server, replay_state):
+    for _ in range(5):
+        token = form_token(get(replay_server, "/")[2])
+        get(replay_server, f"/search?q=a&token={token}")
+    assert replay_state.searches == 5
+    assert replay_state.score == replay_state.max_points == 15
+
+
+def test_search_without_token(replay_server, replay_state):
+    assert get(replay_server, "/search?q=a")[0] == 200
+    assert replay_state.searches == 0
+
+
+def test_suggestions(replay_server):
+    status, _, body = get(replay_server, "/AS/Suggestions?qry=ab")
+    assert status == 200
+    assert body.count('class="sa_sg"') == 8
+    assert 'data-q="ab 1"' in body
+
+
+def test_score(replay_server, replay_state):
+    replay_state.score = 1234
+    assert get(replay_server, "/rewards/score")[2] == "1234"
+
+
+def test_passport_redirect(replay_server):
+    status, headers, _ = get(replay_server, "/secure/Passport.aspx")
+    assert (status, headers["Location"]) == (302, "/")
+
+
+def test_passport_redirect_when_expired(replay_server, replay_state):
+    replay_state.session_expired = True
+    status, headers, _ = get(replay_server, "/secure/Passport.aspx")
+    assert status == 302
+    location = urlsplit(headers["Location"])
+    assert location.geturl().startswith(replay_server.login_url)
+    # app.check_session() looks for this exact (lowercase-escaped) return URL.
+    assert "wreply=https%3a%2f%2fwww.bing.com%2fsecure%2fPassport.aspx" in location.query
+
+
+def test_login_page(replay_server):
+    assert get(replay_server, "/login.srf")[0] == 200
+
+
+def test_products_etag(replay_server):
+    status, headers, body = get(replay_server, "/api/products")
+    assert status == 200
+    assert '"iOS"' in body
+    etag = headers["ETag"]
+    status, headers, body = get(
+        replay_server, "/api/products", {"If-None-Match": etag}
+    )
+    assert (status, headers["ETag"], body) == (304, etag, "")
+    assert replay_server.products_requests == 2
+
+
+@pytest.mark.parametrize("name", ["app.css", "logo.svg"])
+def test_static_files_are_cacheable(replay_server, name):
+    status, headers, _ = get(replay_server, f"/static/{name}")
+    assert status == 200
+    assert "max-age" in headers["Cache-Control"]
+
+
+@pytest.mark.parametrize("path", ["/static/../server.py", "/static/nope.js", "/nope"])
+def test_not_found(replay_server, path):
+    assert get(replay_server, path)[0] == 404
+
+
+def test_server_without_state():
+    with ReplayServer() as server:
+        assert isinstance(server.state, ReplayState)
+        assert server.url.startswith("http://127.0.0.1:")
@@ -0,0 +1,58 @@
+import json
+import logging
+from bingto.report import Report
+
+
+def test_span():
+    report = Report()
+    for _ in range(2):
+        with report.span("pc.goto"):
+            pass
+    assert len(report.spans["pc.goto"]) == 2
+    assert report.to_dict()["phases"]["pc.goto"]["count"] == 2
+
+
+def test_to_dict():
+    report = Report()
+    report.spans["pc.search"] = [1, 3]
+    report.count("get_score.retries")
+    report.count("get_score.retries", 2)
+    report.gauge("PC.rss_mb", 120)
+    report.gauge("PC.rss_mb", 150)
+    data = report.to_dict()
+    assert data["phases"]["pc.search"] == {
+        "count": 2,
+        "total": 4,
+        "min": 1,
+        "max": 3,
+        "mean": 2,
+    }
+    assert data["retries"] == {"get_score.retries": 3}
+    assert data["gauges"] == {"PC.rss_mb": 150}
+
+
+def test_score_deltas():
+    report = Report()
+    for score in (-1, 100, -1, 105, 110):
+        report.score("pc", score)
+    report.score("mobile", 110)
+    assert report.to_dict()["scores"] == {
+        "pc": {"start": 100, "end": 110, "delta": 10},
+        "mobile": {"start": 110, "end": 110, "delta": 0},
+    }
+
+
+def test_dump(tmp_path):
+    report = Report()
+    report.score("pc", 5)
+    path = tmp_path / "report.json"
+    report.dump(path)
+    assert json.loads(path.read_text())["scores"] == {
+        "pc": {"start": 5, "end": 5, "delta": 0}
+    }
+
+
+def test_dump_failure_is_logged(tmp_path, caplog):
+    with caplog.at_level(logging.ERROR):
+        Report().dump(tmp_path / "missing" / "report.json")
+    assert "Failed to save the run report" in caplog.text
@@ -0,0 +1,113 @@
+"""
+launch_pc() and start_mobile() against the replay stand-in.
+
+Needs the Playwright browsers (`bingto --install`), skipped otherwise.
+"""
+import asyncio
+from pathlib import Path
+import pytest
+from bingto import aio, app
+from bingto.storage import CookieStore
+
+playwright = pytest.importorskip("playwright.sync_api")
+
+EMPTY_STORAGE_STATE = {"cookies": [], "origins": []}
+
+
+def require(p, name: str):
+    if not Path(getattr(p, name).executable_path).exists():
+        pytest.skip(f"{name} is not installed (bingto --install)")
+
+
+@pytest.fixture(autouse=True)
+def fast_waits(monkeypatch):
+    monkeypatch.setattr(app, "WAIT_SCALE", 0.05)
+    monkeypatch.setattr(app, "SCORE_TIMEOUT", 2)
+    monkeypatch.setattr(app, "SCORE_SETTLE", 0.25)
+
+
+@pytest.fixture
+def pool():
+    p = playwright.sync_playwright().start()
+    pool = app.BrowserPool(p, headless=True)
+    try:
+        yield pool
+    finally:
+        pool.close()
+        p.stop()
+
+
+@pytest.fixture
+def store(tmp_path) -> CookieStore:
+    return CookieStore(tmp_path / "cookies.json", EMPTY_STORAGE_STATE)
+
+
+def earned(state) -> int:
+    return state.score - state.start_score
+
+
+def test_pc(pool, store, replay_server, replay_state):
+    require(pool.p, "chromium")
+    app.launch_pc(
+        pool,
+        silent=True,
+        store=store,
+        base_url=replay_server.url,
+        login_url=replay_server.login_url,
+    )
+    assert earned(replay_state) == replay_state.max_points
+    # 5 points per search, then 4 more searches to read the same score 4
+    # times (SearchProgress) before stopping.
+    assert replay_state.searches == replay_state.max_points // 5 + 4
+    assert store.path.exists()
+
+
+def test_mobile(pool, replay_server, replay_state):
+    require(pool.p, "webkit")
+    context = pool.get("webkit").new_context(
+        **pool.p.devices["iPhone 13 Pro Max"], storage_state=EMPTY_STORAGE_STATE
+    )
+    try:
+        app.start_mobile(
+            context.new_page(),
+            base_url=replay_server.url,
+            login_url=replay_server.login_url,
+        )
+    finally:
+        context.close()
+    assert earned(replay_state) == replay_state.max_points
+
+
+def test_expired_session(pool, store, replay_server, replay_state):
+    require(pool.p, "chromium")
+    replay_state.session_expired = True
+    with pytest.raises(SystemExit):
+        app.launch_pc(
+            pool,
+            silent=True,
+            store=store,
+            base_url=replay_server.url,
+            login_url=replay_server.login_url,
+        )
+    assert replay_state.searches == 0
+
+
+def test_pc_async(store, replay_server, replay_state):
+    async def main():
+        async with playwright_async.async_playwright() as p:
+            require(p, "chromium")
+            pool = aio.BrowserPool(p, headless=True)
+            try:
+                await aio.launch_pc(
+                    pool,
+                    silent=True,
+                    store=store,
+                    base_url=replay_server.url,
+                    login_url=replay_server.login_url,
+                )
+            finally:
+                await asyncio.gather(pool.close(), aio.flush_cookies())
+
+    playwright_async = pytest.importorskip("playwright.async_api")
+    asyncio.run(main())
+    assert earned(replay_state) == replay_state.max_points
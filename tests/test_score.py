@@ -0,0 +1,112 @@
+import asyncio
+import pytest
+from time import monotonic
+from playwright.sync_api import Error, TimeoutError
+from bingto import aio, app
+
+
+class ScoreHandle:
+    def __init__(self, value: str):
+        self.value = value
+
+    def json_value(self) -> str:
+        return self.value
+
+
+class FakePage:
+    """
+    Page whose score element shows score, which changes to later (if set)
+    once the caller waits for it to change.
+    """
+
+    def __init__(self, score: int, later: int = None, errors: list[str] = ()):
+        self.score = score
+        self.later = later
+        self.errors = list(errors)
+        self.timeouts: list[float] = []
+
+    def wait_for_function(self, js: str, arg: list, timeout: float) -> ScoreHandle:
+        selector, previous = arg
+        self.timeouts.append(timeout)
+        if self.errors:
+            raise Error(self.errors.pop(0))
+        if self.score != previous:
+            return ScoreHandle(str(self.score))
+        if self.later is not None:
+            return ScoreHandle(str(self.later))
+        raise TimeoutError("Timeout exceeded.")
+
+
+class AsyncScoreHandle(ScoreHandle):
+    async def json_value(self) -> str:
+        return self.value
+
+
+class AsyncFakePage(FakePage):
+    async def wait_for_function(self, js: str, arg: list, timeout: float):
+        return AsyncScoreHandle(super().wait_for_function(js, arg, timeout).value)
+
+
+def test_new_score_is_returned_at_once():
+    page = FakePage(105)
+    assert app.get_score(page, previous=100) == 105
+    assert len(page.timeouts) == 1
+
+
+def test_unchanged_score_waits_until_settled():
+    page = FakePage(100)
+    since = monotonic() - 1
+    assert app.get_score(page, previous=100, timeout=5, since=since) == 100
+    assert len(page.timeouts) == 2
+    assert page.timeouts[1] <= (app.SCORE_SETTLE - 1) * 1000
+
+
+def test_unchanged_score_after_settle_time():
+    page = FakePage(100)
+    since = monotonic() - app.SCORE_SETTLE
+    assert app.get_score(page, previous=100, since=since) == 100
+    assert len(page.timeouts) == 1
+
+
+def test_score_changing_before_settle_time():
+    assert app.get_score(FakePage(100, later=105), previous=100) == 105
+
+
+def test_navigation_is_waited_through():
+    page = FakePage(105, errors=["Execution context was destroyed, most likely"])
+    assert app.get_score(page, previous=100) == 105
+    assert len(page.timeouts) == 2
+
+
+def test_closed_page_is_not_retried():
+    page = FakePage(105, errors=["Target page, context or browser has been closed"])
+    with pytest.raises(Error):
+        app.get_score(page, previous=100)
+    assert len(page.timeouts) == 1
+
+
+def test_missing_score():
+    # READ_SCORE_JS never resolves while the element holds no number.
+    assert app.get_score(FakePage(-1), timeout=1) == -1
+
+
+@pytest.mark.parametrize(
+    "page, expected",
+    [
+        (AsyncFakePage(105), 105),
+        (AsyncFakePage(100), 100),
+        (AsyncFakePage(100, later=105), 105),
+        (AsyncFakePage(105, errors=["Execution context was destroyed"]), 105),
+    ],
+)
+def test_async_get_score(page, expected):
+    assert asyncio.run(aio.get_score(page, previous=100)) == expected
+
+
+def test_async_closed_page_is_not_retried():
+    page = AsyncFakePage(
+        105, errors=["Target page, context or browser has been closed"]
+    )
+    with pytest.raises(Error):
+        asyncio.run(aio.get_score(page, previous=100))
+    assert len(page.timeouts) == 1
@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+from bingto import app
+
+IPHONE = {
+    "user_agent": "iPhone",
+    "viewport": {"width": 428, "height": 746},
+    "device_scale_factor": 3,
+    "is_mobile": True,
+    "has_touch": True,
+}
+DESKTOP_EDGE = {
+    "user_agent": "Edge",
+    "viewport": {"width": 1280, "height": 720},
+    "device_scale_factor": 1,
+    "is_mobile": False,
+    "has_touch": False,
+}
+
+
+def fake_playwright() -> SimpleNamespace:
+    return SimpleNamespace(
+        devices={
+            "iPhone 13 Pro Max": dict(IPHONE),
+            "Desktop Edge": dict(DESKTOP_EDGE),
+        }
+    )
+
+
+def test_search_stops_after_3_unchanged_scores():
+    progress = app.SearchProgress("pc")
+    assert all(progress.record(score) for score in (0, 3, 6, 6, 6, 6))
+    assert not progress.record(6)
+
+
+def test_search_progress_ignores_missing_scores():
+    progress = app.SearchProgress("pc")
+    assert progress.record(3) and progress.record(3)
+    assert progress.record(-1)
+    assert progress.previous == 3 and progress.same_score_count == 1
+    assert progress.record(6)
+    assert progress.same_score_count == 0
+
+
+def test_mobile_context_options_leave_devices_alone():
+    p = fake_playwright()
+    options = app.mobile_context_options(p, "120.0.2210.126")
+    assert "EdgiOS/120.0.2210.126" in options["user_agent"]
+    assert options["locale"] == "vi-VN"
+    assert options["is_mobile"]
+    assert p.devices["iPhone 13 Pro Max"] == IPHONE
+
+
+def test_mobile_context_options_with_pc_profile():
+    p = fake_playwright()
+    options = app.mobile_context_options(
+        p, "120.0.2210.126", use_pc_profile=True, low_memory=True
+    )
+    assert "EdgiOS/120.0.2210.126" in options["user_agent"]
+    assert not options["is_mobile"]
+    assert p.devices["Desktop Edge"] == DESKTOP_EDGE
+
+
+def test_real_viewport_size():
+    p = fake_playwright()
+    assert app.real_viewport_size(p) == {"width": 1284, "height": 2238}
+    assert app.real_viewport_size(p, low_memory=True) is None
+
+
+def test_mobile_browser():
+    assert app.mobile_browser(False, False, False) == ("webkit", False)
+    assert app.mobile_browser(True, False, False) == ("chromium", True)
+    assert app.mobile_browser(True, True, False) == ("chromium", False)
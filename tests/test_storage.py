@@ -0,0 +1,83 @@
+import asyncio
+import json
+import os
+import stat
+import pytest
+from bingto import aio
+from bingto.storage import CookieStore
+
+STATE = {"cookies": [{"name": "MUID", "value": "1"}], "origins": []}
+
+
+def test_load_parses_once(tmp_path):
+    path = tmp_path / "cookies.json"
+    path.write_text(json.dumps(STATE))
+    store = CookieStore(path)
+    assert store.exists()
+    assert store.load() == STATE
+    path.unlink()
+    assert store.load() == STATE
+
+
+def test_update_writes_only_changes(tmp_path):
+    path = tmp_path / "cookies.json"
+    path.write_text(json.dumps(STATE))
+    store = CookieStore(path)
+    store.load()
+    assert not store.update(json.loads(json.dumps(STATE)))
+    new_state = {**STATE, "cookies": []}
+    assert store.update(new_state)
+    assert json.loads(path.read_text()) == new_state
+    assert store.load() == new_state
+
+
+def test_write_is_private_and_atomic(tmp_path):
+    path = tmp_path / "sub" / "cookies.json"
+    store = CookieStore(path, state={})
+    assert store.update(STATE)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert os.listdir(path.parent) == ["cookies.json"]
+
+
+def test_replace_is_visible_before_flush(tmp_path):
+    path = tmp_path / "cookies.json"
+    store = CookieStore(path, state={})
+    assert store.replace(STATE)
+    assert store.load() == STATE
+    assert not path.exists()
+    assert store.flush()
+    assert not store.flush()
+    assert json.loads(path.read_text()) == STATE
+
+
+def test_failed_write_still_updates_memory(tmp_path):
+    # The parent "directory" is a file, so the write fails.
+    path = tmp_path / "file" / "cookies.json"
+    path.parent.write_text("")
+    store = CookieStore(path, state={})
+    with pytest.raises(OSError):
+        store.update(STATE)
+    assert store.load() == STATE
+    assert not list(tmp_path.glob("**/*.tmp"))
+
+
+class FakeContext:
+    def __init__(self, state: dict):
+        self.state = state
+
+    async def storage_state(self) -> dict:
+        return self.state
+
+
+def test_async_save_hands_the_state_over_at_once(tmp_path):
+    path = tmp_path / "cookies.json"
+    store = CookieStore(path, state={})
+
+    async def main():
+        await aio.save_cookies(FakeContext(STATE), store, "pc")
+        # What the mobile phase would load next, before the write is done.
+        assert store.load() == STATE
+        await aio.flush_cookies()
+
+    asyncio.run(main())
+    assert json.loads(path.read_text()) == STATE
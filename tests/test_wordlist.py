@@ -0,0 +1,69 @@
+import sys
+import types
+import pytest
+from bingto import wordlist
+from bingto.wordlist import WordList, build_word_list
+
+WORDS = {"zebra", "apple", "mango", "éclair", "kiwi"}
+
+
+@pytest.fixture
+def word_list(tmp_path, monkeypatch):
+    english_words = types.ModuleType("english_words")
+    def get_english_words_set(sources, lower):
+        assert sources == ["web2"] and lower
+        return set(WORDS)
+
+    english_words.get_english_words_set = get_english_words_set
+    monkeypatch.setitem(sys.modules, "english_words", english_words)
+    path = tmp_path / "words.wl"
+    build_word_list(path)
+    words = WordList(path)
+    yield words
+    words.close()
+
+
+def test_sequence(word_list):
+    assert len(word_list) == len(WORDS)
+    assert list(word_list) == sorted(WORDS)
+    assert word_list[-1] == "éclair"
+    assert word_list[1:3] == sorted(WORDS)[1:3]
+    with pytest.raises(IndexError):
+        word_list[len(WORDS)]
+
+
+def test_contains(word_list):
+    for word in WORDS:
+        assert word in word_list
+    for word in ("", "aaa", "banana", "zzz", None):
+        assert word not in word_list
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "words.txt"
+    path.write_text("apple\nzebra\n")
+    with pytest.raises(ValueError):
+        WordList(path)
+
+
+def test_set_semantics(word_list):
+    assert word_list == WORDS
+    assert word_list & {"apple", "banana"} == {"apple"}
+    assert word_list.isdisjoint({"banana"})
+
+
+@pytest.mark.parametrize("size", [3, 10, 40, -1])
+def test_rejects_truncated_files(word_list, tmp_path, size):
+    path = tmp_path / "truncated.wl"
+    path.write_bytes(word_list._mm[:size])
+    with pytest.raises(ValueError):
+        WordList(path)
+
+
+def test_rebuilds_truncated_cache(word_list, tmp_path, monkeypatch):
+    path = tmp_path / "cache.wl"
+    path.write_bytes(word_list._mm[:-1])
+    monkeypatch.setattr(wordlist, "_word_list", None)
+    rebuilt = wordlist.get_word_list(path)
+    assert list(rebuilt) == sorted(WORDS)
+    rebuilt.close()